@@ -1,26 +1,39 @@
 from gevent import monkey
 monkey.patch_all()
 
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify, json as flask_json
 from flask_pymongo import PyMongo
 from flask_bcrypt import Bcrypt
 from flask_socketio import SocketIO
 from flask_cors import CORS
 from config import Config
+from app.cache import TTLCache
+from app.json_provider import FastJSONProvider
+from app import metrics
 
 mongo = PyMongo()
 bcrypt = Bcrypt()
-socketio = SocketIO(cors_allowed_origins="*")
+# Socket.IO packets go through the app's JSON provider too
+socketio = SocketIO(cors_allowed_origins="*", json=flask_json)
+user_cache = TTLCache()
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = FastJSONProvider(app)
 
     # Initialize extensions
     mongo.init_app(app)
     bcrypt.init_app(app)
-    socketio.init_app(app)
+    socketio.init_app(app, message_queue=app.config['SOCKETIO_MESSAGE_QUEUE'])
     CORS(app)
+    user_cache.configure(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+    metrics.register('user_cache', user_cache.stats)
+
+    from app.invalidation import invalidation_bus
+    invalidation_bus.init_app(app)
+    invalidation_bus.register('user', user_cache.invalidate)
+    metrics.register('invalidation_bus', invalidation_bus.stats)
 
     # Register Blueprints
     from app.auth.routes import auth_bp
@@ -33,6 +46,49 @@ def create_app(config_class=Config):
     app.register_blueprint(opportunities_bp, url_prefix='/api/opportunities')
     app.register_blueprint(roadmap_bp, url_prefix='/api/roadmap')
 
+    from app.auth.hashing import password_hasher
+    password_hasher.init_app(app)
+    metrics.register('password_hasher', password_hasher.stats)
+
+    from app.social.feed_cache import feed_ring, originals_cache
+    feed_ring.init_app(app)
+    invalidation_bus.register('feed_ring', lambda key: feed_ring.invalidate())
+    invalidation_bus.register('feed_touch', lambda key: feed_ring.touch())
+    metrics.register('feed_ring', feed_ring.stats)
+    metrics.register('repost_originals', originals_cache.stats)
+
+    from app.social.timeline import timelines
+    timelines.init_app(app)
+
+    from app.social.chat_writer import chat_writer
+    chat_writer.init_app(app)
+    metrics.register('chat_writer', chat_writer.stats)
+
+    from app.social.emitter import emitter
+    emitter.init_app(app)
+    metrics.register('emitter', emitter.stats)
+
+    from app import indexes
+    indexes.init_app(app)
+
+    from app import compression
+    compression.init_app(app)
+
+    from app.roadmap.llm_client import llm_client
+    llm_client.init_app(app)
+    metrics.register('llm_client', llm_client.stats)
+    metrics.register('llm_breaker', llm_client.breaker.stats)
+
+    from app.roadmap.llm_cache import llm_cache
+    llm_cache.init_app(app)
+    metrics.register('llm_cache', llm_cache.stats)
+
+    from app.roadmap.single_flight import llm_flights
+    metrics.register('llm_single_flight', llm_flights.stats)
+
+    from app import conditional
+    metrics.register('conditional', lambda: dict(conditional.stats))
+
     @app.route('/')
     def index():
         return render_template('index.html')
@@ -41,4 +97,13 @@ def create_app(config_class=Config):
     def dashboard():
         return render_template('dashboard.html')
 
+    # Internal counters; off by default and only for signed-in users when on
+    if app.config['METRICS_ENABLED']:
+        from app.utils import token_required
+
+        @app.route('/api/metrics')
+        @token_required
+        def get_metrics(current_user):
+            return jsonify(metrics.snapshot()), 200
+
     return app
@@ -0,0 +1,62 @@
+import time
+from gevent.threadpool import ThreadPool
+from app import bcrypt
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs bcrypt in native threads so the gevent hub keeps serving other greenlets.
+
+    At most `max_pending` calls may be queued or running at once; beyond that
+    callers get HasherBusy immediately instead of piling up behind the pool.
+    """
+
+    def __init__(self):
+        self._pool = None
+        self.workers = 0
+        self.max_pending = 0
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_time = 0.0
+
+    def init_app(self, app):
+        self.workers = app.config['BCRYPT_POOL_SIZE']
+        self.max_pending = app.config['BCRYPT_MAX_PENDING']
+        self._pool = ThreadPool(self.workers)
+
+    def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherBusy()
+
+        self.pending += 1
+        start = time.monotonic()
+        try:
+            return self._pool.spawn(func, *args).get()
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self.total_time += time.monotonic() - start
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def check(self, pw_hash, password):
+        return self._run(bcrypt.check_password_hash, pw_hash, password)
+
+    def stats(self):
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'avg_ms': round(self.total_time * 1000 / self.completed, 2) if self.completed else 0.0
+        }
+
+
+password_hasher = PasswordHasher()
@@ -1,7 +1,9 @@
 from flask import request, jsonify, current_app
 from app.auth import auth_bp
-from app import mongo, bcrypt
+from app import mongo
+from app.auth.hashing import password_hasher, HasherBusy
 import jwt
+from pymongo.errors import DuplicateKeyError
 import datetime
 
 @auth_bp.route('/register', methods=['POST'])
@@ -14,17 +16,23 @@ def register():
     if mongo.db.users.find_one({'email': data['email']}):
         return jsonify({'message': 'User already exists'}), 400
 
-    hashed_password = bcrypt.generate_password_hash(data['password']).decode('utf-8')
-
-    user_id = mongo.db.users.insert_one({
-        'name': data['name'],
-        'email': data['email'],
-        'password': hashed_password,
-        'career_goal': data.get('career_goal', ''),
-        'interests': data.get('interests', []),
-        'skills': data.get('skills', []),
-        'created_at': datetime.datetime.utcnow()
-    }).inserted_id
+    try:
+        hashed_password = password_hasher.hash(data['password'])
+    except HasherBusy:
+        return jsonify({'message': 'Server busy, please try again'}), 503, {'Retry-After': '1'}
+
+    try:
+        user_id = mongo.db.users.insert_one({
+            'name': data['name'],
+            'email': data['email'],
+            'password': hashed_password,
+            'career_goal': data.get('career_goal', ''),
+            'interests': data.get('interests', []),
+            'skills': data.get('skills', []),
+            'created_at': datetime.datetime.utcnow()
+        }).inserted_id
+    except DuplicateKeyError:
+        return jsonify({'message': 'User already exists'}), 400
 
     return jsonify({'message': 'User created successfully', 'user_id': str(user_id)}), 201
 
@@ -37,7 +45,12 @@ def login():
 
     user = mongo.db.users.find_one({'email': data['email']})
 
-    if not user or not bcrypt.check_password_hash(user['password'], data['password']):
+    try:
+        valid = bool(user) and password_hasher.check(user['password'], data['password'])
+    except HasherBusy:
+        return jsonify({'message': 'Server busy, please try again'}), 503, {'Retry-After': '1'}
+
+    if not valid:
         return jsonify({'message': 'Invalid email or password'}), 401
 
     token = jwt.encode({
@@ -0,0 +1,74 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction."""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, maxsize=None, ttl=None):
+        with self._lock:
+            if maxsize is not None:
+                self.maxsize = maxsize
+            if ttl is not None:
+                self.ttl = ttl
+            self._trim()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            self._trim()
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _trim(self):
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
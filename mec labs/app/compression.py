@@ -0,0 +1,165 @@
+import gzip
+import mimetypes
+import os
+import zlib
+import click
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain'
+}
+STATIC_EXTENSIONS = ('.css', '.js')
+
+# Variant suffix for each Content-Encoding, best first
+STATIC_VARIANTS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _accepted(encoding):
+    return request.accept_encodings[encoding] > 0
+
+
+def _choose_encoding():
+    if brotli is not None and _accepted('br'):
+        return 'br'
+    if _accepted('gzip'):
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding, level):
+    if encoding == 'br':
+        return brotli.compress(data, quality=level['br'])
+    return gzip.compress(data, compresslevel=level['gzip'], mtime=0)
+
+
+def _stream(chunks, encoding, level):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level['br'])
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(level['gzip'], zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+def _add_vary(response):
+    response.vary.add('Accept-Encoding')
+
+
+def compress_response(response, min_size, level):
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return response
+    if response.mimetype not in COMPRESSIBLE_TYPES or 'Content-Encoding' in response.headers:
+        return response
+    # send_file responses: static files are served precompressed instead
+    if response.direct_passthrough:
+        return response
+
+    _add_vary(response)
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _stream(response.iter_encoded(), encoding, level)
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(_compress(data, encoding, level))
+
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed body is a different representation
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def compress_static(folder):
+    """Write .gz (and .br when brotli is installed) next to each CSS and JS file."""
+    written = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if not name.endswith(STATIC_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data, quality=11)
+            for suffix, body in variants.items():
+                with open(path + suffix, 'wb') as f:
+                    f.write(body)
+                written.append(path + suffix)
+    return written
+
+
+def init_app(app):
+    """Compress API and page responses and serve precompressed static files.
+
+    Responses of a compressible type and at least COMPRESS_MIN_SIZE bytes are
+    compressed with brotli or gzip, whichever the client accepts (brotli only
+    if installed). Streamed responses are compressed chunk by chunk, except
+    text/event-stream, which is not in the compressible set. Socket.IO traffic
+    never reaches Flask's response hooks and is left alone.
+    """
+    min_size = app.config['COMPRESS_MIN_SIZE']
+    level = {'gzip': app.config['COMPRESS_GZIP_LEVEL'], 'br': app.config['COMPRESS_BR_QUALITY']}
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, min_size, level)
+
+    static_view = app.view_functions['static']
+
+    def _fresh_variant(filename, suffix):
+        # A variant older than its source was left behind by an edit; ignore it
+        source = os.path.join(app.static_folder, filename)
+        try:
+            return os.path.getmtime(source + suffix) >= os.path.getmtime(source)
+        except OSError:
+            return False
+
+    def static(filename):
+        if filename.endswith(STATIC_EXTENSIONS):
+            for encoding, suffix in STATIC_VARIANTS:
+                if _accepted(encoding) and _fresh_variant(filename, suffix):
+                    response = send_from_directory(app.static_folder, filename + suffix)
+                    response.mimetype = mimetypes.guess_type(filename)[0]
+                    response.headers['Content-Encoding'] = encoding
+                    _add_vary(response)
+                    return response
+
+            # The uncompressed file is one of several variants of this URL too
+            response = static_view(filename=filename)
+            _add_vary(response)
+            return response
+        return static_view(filename=filename)
+
+    app.view_functions['static'] = static
+
+    @app.cli.command('compress-static')
+    def compress_static_command():
+        """Precompress static CSS and JS files."""
+        for path in compress_static(app.static_folder):
+            click.echo(f"wrote {path}")
@@ -0,0 +1,42 @@
+from functools import wraps
+from flask import request, make_response, current_app
+
+stats = {'not_modified': 0, 'tagged': 0}
+
+
+def etag(version):
+    """Tag a view's responses with a weak ETag built from `version(*args, **kwargs)`.
+
+    `version` gets the same arguments as the view (so current_user when used
+    under token_required) and must be cheap: a version counter, not a hash of
+    the body. A matching If-None-Match is answered with 304 before the view
+    runs. Returning None skips both the check and the tag.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            tag = version(*args, **kwargs)
+            if tag is None:
+                return f(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(tag):
+                stats['not_modified'] += 1
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                stats['tagged'] += 1
+
+            response.set_etag(tag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return decorated
+
+    return decorator
+
+
+def user_version(current_user, *args, **kwargs):
+    # `rev` is bumped by update_user on every write to the user document
+    return f"user-{current_user['_id']}-{current_user.get('rev', 0)}"
@@ -0,0 +1,115 @@
+import click
+from pymongo import ASCENDING, DESCENDING, MongoClient
+from pymongo.errors import OperationFailure
+
+# collection -> [(name, keys, options)]
+INDEXES = {
+    'users': [
+        ('email_unique', [('email', ASCENDING)], {'unique': True}),
+        ('followers_count_desc', [('followers_count', DESCENDING)], {}),
+    ],
+    'posts': [
+        ('created_at_id_desc', [('created_at', DESCENDING), ('_id', DESCENDING)], {}),
+        ('user_created_at', [('user_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {}),
+    ],
+    'likes': [
+        ('post_user_unique', [('post_id', ASCENDING), ('user_id', ASCENDING)], {'unique': True}),
+    ],
+    'comments': [
+        ('post_created_at', [('post_id', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {}),
+    ],
+    'follows': [
+        ('follower_followee_unique', [('follower_id', ASCENDING), ('followee_id', ASCENDING)], {'unique': True}),
+        ('followee_id', [('followee_id', ASCENDING)], {}),
+    ],
+    'timelines': [
+        ('user_created_at', [('user_id', ASCENDING), ('created_at', DESCENDING), ('post_id', DESCENDING)], {}),
+    ],
+    'chat_messages': [
+        ('room_created_at', [('room', ASCENDING), ('created_at', DESCENDING), ('_id', DESCENDING)], {}),
+    ],
+    'llm_cache': [
+        ('expires_at_ttl', [('expires_at', ASCENDING)], {'expireAfterSeconds': 0}),
+    ],
+}
+
+
+def ensure_indexes(db):
+    """Create every declared index; return (created, failed) name lists.
+
+    Each index is attempted on its own, so one rejected index (say duplicate
+    emails blocking users.email_unique) does not skip the unique indexes the
+    like and follow toggles rely on. Connection errors are raised at once
+    rather than waited out for every index.
+    """
+    created, failed = [], []
+    for collection, specs in INDEXES.items():
+        for name, keys, options in specs:
+            try:
+                db[collection].create_index(keys, name=name, **options)
+            except OperationFailure as e:
+                failed.append((f"{collection}.{name}", e))
+            else:
+                created.append(f"{collection}.{name}")
+    return created, failed
+
+
+def report_indexes(db):
+    report = {}
+    for collection, specs in INDEXES.items():
+        declared = {name for name, _, _ in specs}
+        existing = set(db[collection].index_information()) - {'_id_'}
+
+        try:
+            usage = {
+                stat['name']: stat['accesses']['ops']
+                for stat in db[collection].aggregate([{'$indexStats': {}}])
+            }
+        except OperationFailure:
+            usage = {}
+
+        report[collection] = {
+            'missing': sorted(declared - existing),
+            'undeclared': sorted(existing - declared),
+            'unused': sorted(name for name in existing if usage.get(name) == 0)
+        }
+    return report
+
+
+def init_app(app):
+    @app.cli.command('indexes')
+    @click.option('--report', is_flag=True, help='Only report missing, undeclared and unused indexes.')
+    def indexes_command(report):
+        """Create the declared MongoDB indexes (idempotent)."""
+        from app import mongo
+
+        if not report:
+            created, failed = ensure_indexes(mongo.db)
+            for name in created:
+                click.echo(f"ensured {name}")
+            for name, error in failed:
+                click.echo(f"failed {name}: {error}", err=True)
+
+        for collection, status in report_indexes(mongo.db).items():
+            for kind in ('missing', 'undeclared', 'unused'):
+                for name in status[kind]:
+                    click.echo(f"{kind}: {collection}.{name}")
+
+    if app.config['ENSURE_INDEXES_ON_STARTUP']:
+        from app import mongo
+
+        # A short-lived client with its own server selection timeout, so an
+        # unreachable Mongo delays each worker's boot by seconds, not minutes
+        client = MongoClient(app.config['MONGO_URI'], serverSelectionTimeoutMS=app.config['INDEX_BOOTSTRAP_TIMEOUT_MS'])
+        try:
+            _, failed = ensure_indexes(client[mongo.db.name])
+        except Exception as e:
+            app.logger.error(f"Index bootstrap skipped: {e}")
+            return
+        finally:
+            client.close()
+
+        for name, error in failed:
+            app.logger.error(f"Index bootstrap failed for {name}: {error}")
+        if failed:
+            app.logger.error(f"{len(failed)} of {sum(map(len, INDEXES.values()))} indexes missing; run `flask indexes` once the data is fixed")
@@ -0,0 +1,64 @@
+import json
+import uuid
+from app import socketio
+
+CHANNEL = 'universe:invalidate'
+
+
+class InvalidationBus:
+    """Tells the other worker processes to drop in-process cached state.
+
+    Only active when SOCKETIO_MESSAGE_QUEUE points at Redis; with a single
+    worker there is nobody else to tell. Callers invalidate their own process
+    directly and use publish() for the rest.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self.published = 0
+        self.received = 0
+        self._redis = None
+        self._handlers = {}
+
+    def init_app(self, app):
+        url = app.config['SOCKETIO_MESSAGE_QUEUE']
+        if url and url.startswith(('redis://', 'rediss://')):
+            import redis
+            self._redis = redis.Redis.from_url(url)
+            socketio.start_background_task(self._listen)
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def publish(self, kind, key=None):
+        if self._redis is None:
+            return
+        try:
+            self._redis.publish(CHANNEL, json.dumps([self.origin, kind, key]))
+            self.published += 1
+        except Exception as e:
+            print(f"Invalidation publish failed: {e}")
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                for message in pubsub.listen():
+                    origin, kind, key = json.loads(message['data'])
+                    if origin != self.origin and kind in self._handlers:
+                        self.received += 1
+                        self._handlers[kind](key)
+            except Exception as e:
+                print(f"Invalidation listener error: {e}")
+                socketio.sleep(1)
+
+    def stats(self):
+        return {
+            'enabled': self._redis is not None,
+            'published': self.published,
+            'received': self.received
+        }
+
+
+invalidation_bus = InvalidationBus()
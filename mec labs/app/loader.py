@@ -0,0 +1,53 @@
+from flask import g, has_request_context
+from app import mongo
+
+
+class DataLoader:
+    """Per-request memo of documents keyed by (collection, _id).
+
+    Every distinct document costs at most one Mongo round trip for the life of
+    the request; `round_trips` counts the queries actually issued.
+    """
+
+    def __init__(self):
+        self.round_trips = 0
+        self._docs = {}
+
+    def prime(self, collection, doc):
+        self._docs[(collection, doc['_id'])] = doc
+
+    def forget(self, collection, _id):
+        self._docs.pop((collection, _id), None)
+
+    def load(self, collection, _id):
+        return self.load_many(collection, [_id]).get(_id)
+
+    def load_many(self, collection, ids):
+        missing = [_id for _id in dict.fromkeys(ids) if (collection, _id) not in self._docs]
+        if missing:
+            if len(missing) == 1:
+                query = {'_id': missing[0]}
+            else:
+                query = {'_id': {'$in': missing}}
+            self.round_trips += 1
+            found = {doc['_id']: doc for doc in mongo.db[collection].find(query)}
+            for _id in missing:
+                self._docs[(collection, _id)] = found.get(_id)
+
+        docs = {}
+        for _id in ids:
+            doc = self._docs[(collection, _id)]
+            if doc is not None:
+                docs[_id] = doc
+        return docs
+
+
+def get_loader():
+    if 'loader' not in g:
+        g.loader = DataLoader()
+    return g.loader
+
+
+def forget(collection, _id):
+    if has_request_context() and 'loader' in g:
+        g.loader.forget(collection, _id)
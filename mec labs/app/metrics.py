@@ -0,0 +1,9 @@
+_providers = {}
+
+
+def register(name, provider):
+    _providers[name] = provider
+
+
+def snapshot():
+    return {name: provider() for name, provider in _providers.items()}
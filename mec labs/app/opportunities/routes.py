@@ -1,6 +1,9 @@
+import json
+import zlib
 from flask import request, jsonify
 from app.opportunities import opportunities_bp
 from app.utils import token_required
+from app.conditional import etag
 
 MOCK_OPPORTUNITIES = [
     {
@@ -93,8 +96,12 @@ MOCK_OPPORTUNITIES = [
     }
 ]
 
+# The list only changes with a deploy, so its version is fixed at import
+OPPORTUNITIES_VERSION = '%08x' % zlib.crc32(json.dumps(MOCK_OPPORTUNITIES, sort_keys=True).encode('utf-8'))
+
 @opportunities_bp.route('/', methods=['GET'])
 @token_required
+@etag(lambda current_user: f"opportunities-{OPPORTUNITIES_VERSION}")
 def get_opportunities(current_user):
     category_filter = request.args.get('category')
     mode_filter = request.args.get('mode')
@@ -0,0 +1,32 @@
+import base64
+import datetime
+import json
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(doc):
+    raw = json.dumps([doc['created_at'].isoformat(), str(doc['_id'])])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, _id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(created_at), ObjectId(_id)
+    except (ValueError, TypeError, InvalidId):
+        raise InvalidCursor(f"Invalid cursor: {cursor}")
+
+
+def keyset_filter(cursor, op, id_field='_id'):
+    # (created_at, id_field) strictly before ('$lt') or after ('$gt') the cursor
+    created_at, _id = decode_cursor(cursor)
+    return {'$or': [
+        {'created_at': {op: created_at}},
+        {'created_at': created_at, id_field: {op: _id}}
+    ]}
@@ -0,0 +1,80 @@
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Fail fast while a dependency is down.
+
+    After `threshold` consecutive failures the breaker opens and allow()
+    raises CircuitOpen for `reset_timeout` seconds. Then it goes half-open
+    and lets a single probe through: success closes it, failure reopens it.
+    A probe that never reports back is given up on after `reset_timeout`,
+    so one lost caller cannot keep the breaker half-open for good.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+
+    def configure(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+
+    def allow(self):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._probing = False
+
+            if self.state == CLOSED:
+                return
+            if self.state == HALF_OPEN and (not self._probing or now - self._probe_at >= self.reset_timeout):
+                self._probing = True
+                self._probe_at = now
+                return
+
+            self.rejected += 1
+        raise CircuitOpen('LLM circuit open, serving fallback')
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'threshold': self.threshold,
+            'reset_timeout': self.reset_timeout,
+            'opened': self.opened,
+            'rejected': self.rejected
+        }
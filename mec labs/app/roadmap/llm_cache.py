@@ -0,0 +1,75 @@
+import datetime
+from app import mongo
+from app.cache import TTLCache
+
+
+class LLMCache:
+    """Two-tier cache for LLM results: an in-process LRU over a Mongo collection.
+
+    Entries are stored in `llm_cache` as {_id: '<kind>:<key>', value,
+    expires_at}; the TTL index on expires_at lets Mongo delete them, so warm
+    entries survive restarts and are shared by every worker. The LRU keeps
+    the hottest LLM_CACHE_LOCAL_SIZE entries in memory.
+    """
+
+    def __init__(self):
+        self.ttl = 7 * 24 * 3600
+        self.local = TTLCache(maxsize=500, ttl=3600)
+        self.remote_hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def init_app(self, app):
+        self.ttl = app.config['LLM_CACHE_TTL']
+        self.local.configure(app.config['LLM_CACHE_LOCAL_SIZE'], min(self.ttl, 3600))
+
+    @staticmethod
+    def key(kind, *parts):
+        return kind + ':' + '|'.join(' '.join(str(part).lower().split()) for part in parts)
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+
+        try:
+            doc = mongo.db.llm_cache.find_one({'_id': key, 'expires_at': {'$gt': datetime.datetime.utcnow()}})
+        except Exception as e:
+            print(f"LLM cache read failed: {e}")
+            self.errors += 1
+            doc = None
+
+        if doc is None:
+            self.misses += 1
+            return None
+
+        self.remote_hits += 1
+        self.local.set(key, doc['value'])
+        return doc['value']
+
+    def set(self, key, value):
+        self.local.set(key, value)
+
+        try:
+            mongo.db.llm_cache.update_one(
+                {'_id': key},
+                {'$set': {'value': value, 'expires_at': datetime.datetime.utcnow() + datetime.timedelta(seconds=self.ttl)}},
+                upsert=True
+            )
+        except Exception as e:
+            print(f"LLM cache write failed: {e}")
+            self.errors += 1
+
+    def stats(self):
+        local = self.local.stats()
+        lookups = local['hits'] + self.remote_hits + self.misses
+        return {
+            'local': local,
+            'remote_hits': self.remote_hits,
+            'misses': self.misses,
+            'errors': self.errors,
+            'hit_rate': round((local['hits'] + self.remote_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+llm_cache = LLMCache()
@@ -0,0 +1,254 @@
+import json
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.connection import HTTPSConnection
+from urllib3.util.retry import Retry
+from app.roadmap.circuit_breaker import CircuitBreaker
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+DEFAULT_MODEL = "google/gemini-2.0-flash-exp:free"
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Connect (TCP + TLS) time spent by the current greenlet's request
+_timing = threading.local()
+
+
+class LLMError(Exception):
+    pass
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _timing.connect = getattr(_timing, 'connect', 0.0) + time.monotonic() - start
+            _timing.connections = getattr(_timing, 'connections', 0) + 1
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(self.poolmanager.pool_classes_by_scheme, https=_TimedHTTPSConnectionPool)
+
+
+class LLMClient:
+    """Shared keep-alive session for OpenRouter chat completions.
+
+    Connections are pooled (LLM_POOL_SIZE per host) so calls after the first
+    skip the TCP and TLS handshakes. 429 and 5xx answers and failed connects
+    are retried up to LLM_MAX_RETRIES times with jittered exponential backoff;
+    read timeouts are not, so a call never waits for its timeout twice.
+    Every call records connect, time-to-first-byte and total time per
+    operation. Timeouts, connection errors (also while reading the body) and
+    429/5xx answers (after retries) count against a circuit breaker; only a
+    fully read answer counts as a success. While the breaker is open,
+    complete() raises CircuitOpen at once and callers serve their fallbacks.
+    """
+
+    def __init__(self):
+        self.api_key = None
+        self.referer = 'http://localhost:5001'
+        self.pool_size = 10
+        self.max_retries = 2
+        self.backoff = 0.5
+        self.session = None
+        self.breaker = CircuitBreaker()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.api_key = app.config.get('OPENROUTER_API_KEY')
+        self.pool_size = app.config['LLM_POOL_SIZE']
+        self.max_retries = app.config['LLM_MAX_RETRIES']
+        self.backoff = app.config['LLM_RETRY_BACKOFF']
+        self.breaker.configure(app.config['LLM_BREAKER_THRESHOLD'], app.config['LLM_BREAKER_RESET'])
+        self.session = self._build_session()
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=0,
+            status=self.max_retries,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['POST']),
+            backoff_factor=self.backoff,
+            backoff_jitter=self.backoff,
+            backoff_max=8,
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+        adapter = _PooledAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        return session
+
+    def _send(self, payload, timeout, operation):
+        """POST to OpenRouter and return (response, start, ttfb, attempts) once headers arrive.
+
+        Only a failed request is reported to the breaker here; callers report
+        the outcome once they have read the body.
+        """
+        if self.session is None:
+            self.session = self._build_session()
+        self.breaker.allow()
+
+        _timing.connect, _timing.connections = 0.0, 0
+        start = time.monotonic()
+        try:
+            response = self.session.post(
+                OPENROUTER_URL,
+                headers={"Authorization": f"Bearer {self.api_key}", "HTTP-Referer": self.referer},
+                data=json.dumps(payload),
+                timeout=timeout,
+                stream=True
+            )
+        except BaseException:
+            # Anything, including gevent.Timeout, must release a half-open probe
+            self._record(operation, None, start, None, None)
+            self.breaker.record_failure()
+            raise
+
+        ttfb = time.monotonic() - start
+        attempts = len(response.raw.retries.history) + 1 if response.raw.retries else 1
+        return response, start, ttfb, attempts
+
+    def _settle(self, status):
+        # A complete answer means OpenRouter is up, unless it is a 429/5xx
+        if status in RETRY_STATUSES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def complete(self, messages, timeout, operation='chat', model=DEFAULT_MODEL):
+        """Return the completion text, or raise LLMError / CircuitOpen / requests.RequestException."""
+        response, start, ttfb, attempts = self._send({"model": model, "messages": messages}, timeout, operation)
+        status = None
+        try:
+            body = response.content
+            status = response.status_code
+            if status != 200:
+                raise LLMError(f"OpenRouter {status}: {body[:200].decode('utf-8', 'replace')}")
+            content = json.loads(body)['choices'][0]['message']['content']
+        except LLMError:
+            self._settle(status)
+            raise
+        except BaseException:
+            # Body read timeouts and drops, malformed answers, greenlet kills
+            status = None
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._record(operation, status, start, ttfb, attempts)
+
+        self._settle(status)
+        return content
+
+    def stream(self, messages, timeout, operation='chat_stream', model=DEFAULT_MODEL):
+        """Yield completion text as it arrives, using OpenRouter's `stream: true` SSE API.
+
+        Also records time to first token. Raises like complete(); errors after
+        the first token end the stream.
+        """
+        payload = {"model": model, "messages": messages, "stream": True}
+        response, start, ttfb, attempts = self._send(payload, timeout, operation)
+        status, settled, ttft = None, False, None
+        try:
+            if response.status_code != 200:
+                text = response.text[:200]
+                status = response.status_code
+                raise LLMError(f"OpenRouter {status}: {text}")
+
+            for line in response.iter_lines(decode_unicode=True):
+                # Skip blank separators and ': OPENROUTER PROCESSING' keep-alive comments
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                chunk = json.loads(data)
+                if chunk.get('error'):
+                    raise LLMError(f"OpenRouter stream error: {chunk['error']}")
+                delta = chunk['choices'][0].get('delta', {}).get('content')
+                if delta:
+                    if ttft is None:
+                        ttft = time.monotonic() - start
+                        # The first token proves OpenRouter is answering
+                        self.breaker.record_success()
+                        settled = True
+                    yield delta
+            status = 200
+        except BaseException:
+            if not settled:
+                if status is None:
+                    self.breaker.record_failure()
+                else:
+                    self._settle(status)
+            raise
+        finally:
+            response.close()
+            self._record(operation, status, start, ttfb, attempts, ttft)
+
+        if not settled:
+            self.breaker.record_success()
+
+    def _record(self, operation, status, start, ttfb, attempts, ttft=None):
+        total = time.monotonic() - start
+        call = {
+            'status': status,
+            'attempts': attempts,
+            'new_connections': _timing.connections,
+            'connect_ms': round(_timing.connect * 1000, 1),
+            'ttfb_ms': round(ttfb * 1000, 1) if ttfb is not None else None,
+            'total_ms': round(total * 1000, 1)
+        }
+        if ttft is not None:
+            call['ttft_ms'] = round(ttft * 1000, 1)
+        with self._lock:
+            stats = self._stats.setdefault(operation, {
+                'calls': 0, 'errors': 0, 'new_connections': 0, 'connect_time': 0.0, 'ttfb_time': 0.0,
+                'total_time': 0.0, 'max_total_ms': 0.0, 'ttft_time': 0.0, 'ttft_calls': 0
+            })
+            stats['calls'] += 1
+            if status != 200:
+                stats['errors'] += 1
+            stats['new_connections'] += _timing.connections
+            stats['connect_time'] += _timing.connect
+            stats['ttfb_time'] += ttfb or 0.0
+            stats['total_time'] += total
+            stats['max_total_ms'] = max(stats['max_total_ms'], call['total_ms'])
+            if ttft is not None:
+                stats['ttft_time'] += ttft
+                stats['ttft_calls'] += 1
+            stats['last'] = call
+
+    def stats(self):
+        with self._lock:
+            report = {'pool_size': self.pool_size, 'max_retries': self.max_retries}
+            for operation, stats in self._stats.items():
+                calls = stats['calls']
+                report[operation] = {
+                    'calls': calls,
+                    'errors': stats['errors'],
+                    'new_connections': stats['new_connections'],
+                    'avg_connect_ms': round(stats['connect_time'] * 1000 / calls, 1),
+                    'avg_ttfb_ms': round(stats['ttfb_time'] * 1000 / calls, 1),
+                    'avg_total_ms': round(stats['total_time'] * 1000 / calls, 1),
+                    'max_total_ms': stats['max_total_ms'],
+                    'last': stats['last']
+                }
+                if stats['ttft_calls']:
+                    report[operation]['avg_ttft_ms'] = round(stats['ttft_time'] * 1000 / stats['ttft_calls'], 1)
+            return report
+
+
+llm_client = LLMClient()
@@ -2,15 +2,15 @@ import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import re
-import requests
 import json
 import random
 from app.roadmap.aptitude_bank import CAREER_QUIZZES
+from app.roadmap.llm_client import llm_client
+from app.roadmap.llm_cache import llm_cache
+from app.roadmap.single_flight import llm_flights
 
 class RoadmapEngine:
     def __init__(self):
-        self.quiz_cache = {}
-        self.roadmap_cache = {}
         
         self.knowledge_base = {
             "html_css": {
@@ -182,19 +182,10 @@ class RoadmapEngine:
             
             Return ONLY the single word for the domain. If it's nonsense, return INVALID.
             """
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={"Authorization": f"Bearer {api_key}"},
-                data=json.dumps({
-                    "model": "google/gemini-2.0-flash-exp:free",
-                    "messages": [{"role": "user", "content": prompt}]
-                }),
-                timeout=5
-            )
-            if response.status_code == 200:
-                domain = response.json()['choices'][0]['message']['content'].strip().upper()
-                if domain in ['TECH', 'SCIENCE', 'ART', 'PHILOSOPHY', 'MANAGEMENT', 'TRADES', 'MEDICAL', 'INVALID']:
-                    return domain
+            content = llm_client.complete([{"role": "user", "content": prompt}], timeout=5, operation='classify')
+            domain = content.strip().upper()
+            if domain in ['TECH', 'SCIENCE', 'ART', 'PHILOSOPHY', 'MANAGEMENT', 'TRADES', 'MEDICAL', 'INVALID']:
+                return domain
         except:
             pass
         return "TECH"
@@ -249,8 +240,10 @@ class RoadmapEngine:
             if not api_key:
                 return self._get_fallback_roadmap(topic)
 
-            if topic in self.roadmap_cache:
-                return self.roadmap_cache[topic]
+            cache_key = llm_cache.key('roadmap', topic, level)
+            cached = llm_cache.get(cache_key)
+            if cached is not None:
+                return cached
 
             nptel_instruction = ""
             if any(kw in topic.lower() for kw in ['drone', 'uav', 'robotics', 'engineering', 'india']):
@@ -301,27 +294,18 @@ class RoadmapEngine:
             }}
             """
             
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "HTTP-Referer": "http://localhost:5001",
-                },
-                data=json.dumps({
-                    "model": "google/gemini-2.0-flash-exp:free",
-                    "messages": [{"role": "user", "content": prompt.replace("{acc_level}", level)}]
-                }),
-                timeout=15
-            )
-
-            if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
+            def fetch():
+                content = llm_client.complete(
+                    [{"role": "user", "content": prompt.replace("{acc_level}", level)}],
+                    timeout=15, operation='roadmap'
+                )
                 content = content.replace('```json', '').replace('```', '').strip()
                 result = json.loads(content)
-                self.roadmap_cache[topic] = result
+                llm_cache.set(cache_key, result)
                 return result
-            else:
-                return self._get_fallback_roadmap(topic)
+
+            # Concurrent requests for the same roadmap share one upstream call
+            return llm_flights.do(cache_key, fetch)
 
         except Exception as e:
             print(f"Custom Roadmap Error: {e}")
@@ -381,42 +365,51 @@ class RoadmapEngine:
             ]
         }
 
+    def _chat_messages(self, message, context_category=None):
+        context_info = ""
+        if context_category:
+            context_info = f"The user is currently viewing a {context_category} roadmap."
+
+        return [
+            {"role": "system", "content": f"You are the UNIverse Roadmap Assistant, a helpful AI mentor. Your goal is to guide students on their career paths. {context_info} If they ask 'why' a beginner course is in an advanced section, explain that foundations are critical for high-level scaling. Be concise, encouraging, and professional. use markdown formatting."},
+            {"role": "user", "content": message}
+        ]
+
     def chat(self, message, context_category=None):
-        msg_normalized = self._normalize_query(message)
-        
         try:
             from flask import current_app
             api_key = current_app.config.get('OPENROUTER_API_KEY')
             
             if api_key:
-                context_info = ""
-                if context_category:
-                    context_info = f"The user is currently viewing a {context_category} roadmap."
-                
-                response = requests.post(
-                    url="https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "HTTP-Referer": "http://localhost:5001",
-                    },
-                    data=json.dumps({
-                        "model": "google/gemini-2.0-flash-exp:free",
-                        "messages": [
-                            {"role": "system", "content": f"You are the UNIverse Roadmap Assistant, a helpful AI mentor. Your goal is to guide students on their career paths. {context_info} If they ask 'why' a beginner course is in an advanced section, explain that foundations are critical for high-level scaling. Be concise, encouraging, and professional. use markdown formatting."},
-                            {"role": "user", "content": message}
-                        ]
-                    }),
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    return response.json()['choices'][0]['message']['content']
-                else:
-                    print(f"OpenRouter Error: {response.text}")
+                return llm_client.complete(self._chat_messages(message, context_category), timeout=10, operation='chat')
         except Exception as e:
             print(f"Chat Exception: {str(e)}")
 
-        msg = msg_normalized
+        return self._offline_chat(message)
+
+    def chat_stream(self, message, context_category=None):
+        """Yield the assistant's answer in pieces as the model produces them.
+
+        Falls back to the offline answer if the model fails before its first
+        token; a failure after that just ends the answer early.
+        """
+        from flask import current_app
+        api_key = current_app.config.get('OPENROUTER_API_KEY')
+
+        started = False
+        if api_key:
+            try:
+                for token in llm_client.stream(self._chat_messages(message, context_category), timeout=10):
+                    started = True
+                    yield token
+            except Exception as e:
+                print(f"Chat Stream Exception: {str(e)}")
+
+        if not started:
+            yield self._offline_chat(message)
+
+    def _offline_chat(self, message):
+        msg = self._normalize_query(message)
         if "hello" in msg or "hi" in msg:
             return "Hello! I'm your UNIverse Roadmap Assistant. How can I help you on your learning journey today?"
         
@@ -491,23 +484,10 @@ class RoadmapEngine:
                     ]
                 }}
                 """
-                response = requests.post(
-                    url="https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {api_key}",
-                        "HTTP-Referer": "http://localhost:5001",
-                    },
-                    data=json.dumps({
-                        "model": "google/gemini-2.0-flash-exp:free",
-                        "messages": [{"role": "user", "content": prompt}]
-                    }),
-                    timeout=12
-                )
-                if response.status_code == 200:
-                    content = response.json()['choices'][0]['message']['content']
-                    data = json.loads(content.replace('```json', '').replace('```', '').strip())
-                    if self._validate_quiz(data):
-                        return data
+                content = llm_client.complete([{"role": "user", "content": prompt}], timeout=12, operation='aptitude_quiz')
+                data = json.loads(content.replace('```json', '').replace('```', '').strip())
+                if self._validate_quiz(data):
+                    return data
         except Exception as e:
             print(f"Aptitude AI Gen Error: {e}")
             
@@ -601,9 +581,10 @@ class RoadmapEngine:
         }
 
     def generate_lesson_quiz(self, topic, difficulty="Beginner"):
-        cache_key = f"{topic}_{difficulty}"
-        if cache_key in self.quiz_cache:
-            return self.quiz_cache[cache_key]
+        cache_key = llm_cache.key('lesson_quiz', topic, difficulty)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
             from flask import current_app
@@ -636,27 +617,15 @@ class RoadmapEngine:
             }}
             """
             
-            response = requests.post(
-                url="https://openrouter.ai/api/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "HTTP-Referer": "http://localhost:5001",
-                },
-                data=json.dumps({
-                    "model": "google/gemini-2.0-flash-exp:free",
-                    "messages": [{"role": "user", "content": prompt}]
-                }),
-                timeout=12
-            )
-
-            if response.status_code == 200:
-                content = response.json()['choices'][0]['message']['content']
+            def fetch():
+                content = llm_client.complete([{"role": "user", "content": prompt}], timeout=12, operation='lesson_quiz')
                 data = json.loads(content.replace('```json', '').replace('```', '').strip())
-                if self._validate_quiz(data):
-                    self.quiz_cache[cache_key] = data
-                    return data
-            
-            return self._get_fallback_quiz(topic)
+                if not self._validate_quiz(data):
+                    return None
+                llm_cache.set(cache_key, data)
+                return data
+
+            return llm_flights.do(cache_key, fetch) or self._get_fallback_quiz(topic)
                 
         except Exception as e:
             print(f"Lesson Quiz Gen Error: {e}")
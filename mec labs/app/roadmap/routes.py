@@ -1,8 +1,11 @@
-from flask import request, jsonify
+import json
+import time
+from flask import request, jsonify, Response, stream_with_context
 from app.roadmap import roadmap_bp
-from app.utils import token_required
+from app.utils import token_required, update_user
+from app.loader import get_loader
+from app.conditional import etag, user_version
 from app.roadmap.ml_engine import engine
-from app import mongo
 
 @roadmap_bp.route('/progress/update', methods=['POST'])
 @token_required
@@ -17,8 +20,8 @@ def update_progress(current_user):
         
     key = f"{career_goal}_{step}"
     
-    mongo.db.users.update_one(
-        {'_id': current_user['_id']},
+    update_user(
+        current_user['_id'],
         {'$set': {f"progress.{key}": (status == 'completed')}}
     )
     
@@ -26,8 +29,9 @@ def update_progress(current_user):
 
 @roadmap_bp.route('/progress', methods=['GET'])
 @token_required
+@etag(user_version)
 def get_progress(current_user):
-    user = mongo.db.users.find_one({'_id': current_user['_id']})
+    user = get_loader().load('users', current_user['_id'])
     progress = user.get('progress', {})
     return jsonify({'progress': progress}), 200
 
@@ -40,7 +44,7 @@ def generate_roadmap(current_user):
     level = data.get('level')
 
     user_id = current_user['_id']
-    user = mongo.db.users.find_one({'_id': user_id})
+    user = get_loader().load('users', user_id)
 
     if not career_goal:
         if user.get('active_roadmap'):
@@ -59,7 +63,7 @@ def generate_roadmap(current_user):
     existing_map = next((rm for rm in saved_roadmaps if rm.get('career_goal', '').lower() == career_goal.lower()), None)
     
     if existing_map and not level:
-        mongo.db.users.update_one({'_id': user_id}, {'$set': {'active_roadmap': existing_map}})
+        update_user(user_id, {'$set': {'active_roadmap': existing_map}})
         return jsonify({
             'career_goal': career_goal,
             'roadmap': existing_map,
@@ -71,8 +75,8 @@ def generate_roadmap(current_user):
     new_saved = [rm for rm in saved_roadmaps if rm.get('career_goal', '').lower() != career_goal.lower()]
     new_saved.append(roadmap_data)
 
-    mongo.db.users.update_one(
-        {'_id': user_id},
+    update_user(
+        user_id,
         {'$set': {
             'active_roadmap': roadmap_data,
             'career_goal': career_goal,
@@ -88,8 +92,9 @@ def generate_roadmap(current_user):
 
 @roadmap_bp.route('/list', methods=['GET'])
 @token_required
+@etag(user_version)
 def list_roadmaps(current_user):
-    user = mongo.db.users.find_one({'_id': current_user['_id']})
+    user = get_loader().load('users', current_user['_id'])
     return jsonify({
         'saved_roadmaps': user.get('saved_roadmaps', []),
         'active_roadmap': user.get('active_roadmap')
@@ -98,8 +103,8 @@ def list_roadmaps(current_user):
 @roadmap_bp.route('/reset', methods=['POST'])
 @token_required
 def reset_roadmap(current_user):
-    mongo.db.users.update_one(
-        {'_id': current_user['_id']},
+    update_user(
+        current_user['_id'],
         {'$unset': {'active_roadmap': ""}}
     )
     return jsonify({'message': 'Roadmap reset successful'}), 200
@@ -155,3 +160,29 @@ def roadmap_chat(current_user):
     return jsonify({
         'response': response
     }), 200
+
+@roadmap_bp.route('/chat/stream', methods=['POST'])
+@token_required
+def roadmap_chat_stream(current_user):
+    data = request.get_json() or {}
+    message = data.get('message')
+
+    if not message:
+        return jsonify({'message': 'Please provide a message.'}), 400
+
+    # Server-Sent Events: one 'data' frame per token, then a 'done' frame with timings
+    def events():
+        start = time.monotonic()
+        first_token = None
+        for token in engine.chat_stream(message):
+            if first_token is None:
+                first_token = time.monotonic() - start
+            yield f"data: {json.dumps({'token': token})}\n\n"
+
+        timings = {'ttft_ms': round((first_token or 0) * 1000, 1), 'total_ms': round((time.monotonic() - start) * 1000, 1)}
+        yield f"event: done\ndata: {json.dumps(timings)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -0,0 +1,50 @@
+import threading
+from gevent.event import AsyncResult
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one.
+
+    The first caller for a key runs `fn`; callers arriving while it is in
+    flight wait on a gevent AsyncResult and get the same value or exception.
+    """
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        with self._lock:
+            result = self._calls.get(key)
+            leader = result is None
+            if leader:
+                result = self._calls[key] = AsyncResult()
+
+        if not leader:
+            self.followers += 1
+            return result.get()
+
+        self.leaders += 1
+        try:
+            value = fn()
+        except BaseException as e:
+            result.set_exception(e)
+            raise
+        else:
+            result.set(value)
+            return value
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def stats(self):
+        return {
+            'in_flight': len(self._calls),
+            'leaders': self.leaders,
+            'followers': self.followers
+        }
+
+
+llm_flights = SingleFlight()
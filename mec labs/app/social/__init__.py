@@ -2,4 +2,4 @@ from flask import Blueprint
 
 social_bp = Blueprint('social', __name__)
 
-from app.social import routes
+from app.social import routes, commands, events
@@ -0,0 +1,117 @@
+import atexit
+import threading
+import time
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app import mongo, socketio
+
+
+class ChatWriteBuffer:
+    """Optional write-behind buffer for chat_messages inserts.
+
+    With CHAT_WRITE_BEHIND off every message is a plain insert_one. With it on,
+    messages are collected for up to CHAT_FLUSH_INTERVAL_MS or CHAT_BATCH_SIZE
+    messages and written with one insert_many(ordered=False). At most
+    CHAT_MAX_UNFLUSHED accepted messages may be waiting at any time; that is
+    the most a crash can lose. Reaching it makes the writer flush inline.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.flush_interval = 0.02
+        self.batch_size = 100
+        self.max_unflushed = 500
+        self.batches = 0
+        self.messages = 0
+        self.failures = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+        self._pending = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.enabled = app.config['CHAT_WRITE_BEHIND']
+        self.flush_interval = app.config['CHAT_FLUSH_INTERVAL_MS'] / 1000.0
+        self.batch_size = app.config['CHAT_BATCH_SIZE']
+        self.max_unflushed = max(app.config['CHAT_MAX_UNFLUSHED'], self.batch_size)
+        if self.enabled:
+            atexit.register(self.flush)
+
+    def write(self, message):
+        if not self.enabled:
+            mongo.db.chat_messages.insert_one(message)
+            return
+
+        # Ids are assigned up front so the message can be pushed before it is stored
+        message.setdefault('_id', ObjectId())
+        with self._lock:
+            self._pending.append(message)
+            pending = len(self._pending)
+            schedule = not self._scheduled
+            self._scheduled = True
+
+        if pending >= self.max_unflushed:
+            self.flush()
+        elif pending >= self.batch_size:
+            socketio.start_background_task(self.flush)
+        elif schedule:
+            socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        socketio.sleep(self.flush_interval)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+            self._scheduled = False
+        if not batch:
+            return
+
+        start = time.monotonic()
+        try:
+            mongo.db.chat_messages.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate ids from a retried batch are already stored; anything else is lost
+            errors = [err for err in e.details.get('writeErrors', []) if err.get('code') != 11000]
+            self.failures += len(errors)
+            if errors:
+                print(f"Chat batch write lost {len(errors)} messages: {errors[0].get('errmsg')}")
+        except Exception as e:
+            print(f"Chat batch write failed, requeueing {len(batch)} messages: {e}")
+            with self._lock:
+                self._pending = (batch + self._pending)[-self.max_unflushed:]
+                retry = not self._scheduled
+                self._scheduled = True
+            self.failures += 1
+            if retry:
+                socketio.start_background_task(self._flush_later)
+            return
+
+        elapsed = time.monotonic() - start
+        self.batches += 1
+        self.messages += len(batch)
+        self.last_batch_size = len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.total_flush_time += elapsed
+        self.max_flush_time = max(self.max_flush_time, elapsed)
+
+    def stats(self):
+        return {
+            'enabled': self.enabled,
+            'pending': len(self._pending),
+            'batches': self.batches,
+            'messages': self.messages,
+            'failures': self.failures,
+            'last_batch_size': self.last_batch_size,
+            'max_batch_size': self.max_batch_size,
+            'avg_batch_size': round(self.messages / self.batches, 2) if self.batches else 0.0,
+            'avg_flush_ms': round(self.total_flush_time * 1000 / self.batches, 2) if self.batches else 0.0,
+            'max_flush_ms': round(self.max_flush_time * 1000, 2)
+        }
+
+
+chat_writer = ChatWriteBuffer()
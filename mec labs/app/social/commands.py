@@ -0,0 +1,71 @@
+import click
+import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
+from app.social import social_bp
+from app.social.routes import COMMENT_PREVIEW_SIZE
+
+
+@social_bp.cli.command('migrate-likes')
+def migrate_likes():
+    """Move embedded post likes into the likes collection."""
+    from app import mongo
+
+    migrated = 0
+    for post in mongo.db.posts.find({'likes': {'$exists': True}}, {'likes': 1, 'created_at': 1}):
+        user_ids = post.get('likes', [])
+        if user_ids:
+            mongo.db.likes.bulk_write([
+                UpdateOne(
+                    {'post_id': post['_id'], 'user_id': user_id},
+                    {'$setOnInsert': {'created_at': post.get('created_at', datetime.datetime.utcnow())}},
+                    upsert=True
+                ) for user_id in user_ids
+            ], ordered=False)
+
+        mongo.db.posts.update_one(
+            {'_id': post['_id']},
+            {'$set': {'likes_count': len(user_ids)}, '$unset': {'likes': ''}}
+        )
+        migrated += 1
+
+    click.echo(f"Migrated likes for {migrated} posts")
+
+
+@social_bp.cli.command('migrate-comments')
+def migrate_comments():
+    """Move embedded post comments into the comments collection."""
+    from app import mongo
+
+    migrated = 0
+    for post in mongo.db.posts.find({'comments': {'$exists': True}}, {'comments': 1}):
+        comments = []
+        for legacy in post.get('comments', []):
+            created_at = legacy.get('created_at')
+            if isinstance(created_at, str):
+                created_at = datetime.datetime.fromisoformat(created_at)
+            comments.append({
+                '_id': ObjectId(),
+                'post_id': post['_id'],
+                'user_id': ObjectId(legacy['user_id']),
+                'author_name': legacy['author_name'],
+                'text': legacy['text'],
+                'created_at': created_at or datetime.datetime.utcnow()
+            })
+
+        if comments:
+            mongo.db.comments.insert_many(comments, ordered=False)
+
+        mongo.db.posts.update_one(
+            {'_id': post['_id']},
+            {
+                '$set': {
+                    'comments_count': len(comments),
+                    'recent_comments': comments[-COMMENT_PREVIEW_SIZE:]
+                },
+                '$unset': {'comments': ''}
+            }
+        )
+        migrated += 1
+
+    click.echo(f"Migrated comments for {migrated} posts")
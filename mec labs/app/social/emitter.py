@@ -0,0 +1,72 @@
+import itertools
+import threading
+from app import socketio
+
+BATCH_EVENT = 'batch'
+
+
+class EmitCoalescer:
+    """Collects Socket.IO events per room and sends them as one 'batch' frame.
+
+    Events queued within SOCKETIO_BATCH_WINDOW_MS of the first one go out
+    together as [{'event', 'data'}, ...]. An event queued with a `key`
+    replaces a pending event with the same name and key, so only the latest
+    value of e.g. a post's like count is sent. A window of 0 emits directly.
+    """
+
+    def __init__(self):
+        self.window = 0.05
+        self.events = 0
+        self.frames = 0
+        self.superseded = 0
+        self._pending = {}
+        self._scheduled = False
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.window = app.config['SOCKETIO_BATCH_WINDOW_MS'] / 1000.0
+
+    def emit(self, event, data, to=None, key=None):
+        self.events += 1
+        if self.window <= 0:
+            self.frames += 1
+            socketio.emit(event, data, to=to)
+            return
+
+        slot = (event, key) if key is not None else (event, next(self._seq))
+        with self._lock:
+            room = self._pending.setdefault(to, {})
+            if slot in room:
+                self.superseded += 1
+            room[slot] = {'event': event, 'data': data}
+            schedule = not self._scheduled
+            self._scheduled = True
+
+        if schedule:
+            socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        socketio.sleep(self.window)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._scheduled = False
+
+        for room, events in pending.items():
+            self.frames += 1
+            socketio.emit(BATCH_EVENT, list(events.values()), to=room)
+
+    def stats(self):
+        return {
+            'window_ms': round(self.window * 1000),
+            'events': self.events,
+            'frames': self.frames,
+            'superseded': self.superseded,
+            'pending': sum(len(events) for events in self._pending.values())
+        }
+
+
+emitter = EmitCoalescer()
@@ -0,0 +1,83 @@
+import re
+import jwt
+from flask import request
+from flask_socketio import ConnectionRefusedError, emit, join_room, leave_room, rooms
+from app import socketio
+from app.utils import load_token_user, load_user
+from app.social.routes import chat_room, chat_socket_room, user_socket_room, FEED_SOCKET_ROOM
+
+MAX_POST_SUBSCRIPTIONS = 200
+POST_TOPIC = re.compile(r'^post:[0-9a-f]{24}$')
+
+# sid -> user id of the authenticated connection
+_socket_users = {}
+
+
+def _topic_rooms():
+    return [room for room in rooms() if room == FEED_SOCKET_ROOM or room.startswith('post:')]
+
+
+def _leave_chat_rooms():
+    for room in rooms():
+        if room.startswith('chat:'):
+            leave_room(room)
+
+
+@socketio.on('connect')
+def on_connect(auth=None):
+    try:
+        current_user = load_token_user((auth or {}).get('token') or '')
+    except jwt.InvalidTokenError:
+        current_user = None
+
+    if not current_user:
+        raise ConnectionRefusedError('Authentication required')
+
+    _socket_users[request.sid] = str(current_user['_id'])
+    join_room(user_socket_room(current_user['_id']))
+
+
+@socketio.on('disconnect')
+def on_disconnect(*args):
+    _socket_users.pop(request.sid, None)
+
+
+@socketio.on('subscribe')
+def on_subscribe(data):
+    topics = (data or {}).get('topics') or []
+    subscribed = sum(1 for room in _topic_rooms() if room.startswith('post:'))
+    for topic in topics:
+        if topic == FEED_SOCKET_ROOM:
+            join_room(topic)
+        elif isinstance(topic, str) and POST_TOPIC.match(topic) and subscribed < MAX_POST_SUBSCRIPTIONS:
+            join_room(topic)
+            subscribed += 1
+
+
+@socketio.on('unsubscribe')
+def on_unsubscribe(data=None):
+    # No topics means leave every feed and post topic
+    topics = (data or {}).get('topics')
+    for room in _topic_rooms():
+        if topics is None or room in topics:
+            leave_room(room)
+
+
+@socketio.on('join_chat')
+def on_join_chat(data=None):
+    user_id = _socket_users.get(request.sid)
+    current_user = load_user(user_id) if user_id else None
+    if not current_user:
+        emit('chat_error', {'message': 'Authentication required'})
+        return
+
+    # A socket follows one career room at a time
+    _leave_chat_rooms()
+    room = chat_room(current_user)
+    join_room(chat_socket_room(room))
+    emit('chat_joined', {'room': room, 'user_id': user_id})
+
+
+@socketio.on('leave_chat')
+def on_leave_chat():
+    _leave_chat_rooms()
@@ -0,0 +1,151 @@
+import time
+import threading
+import uuid
+from collections import deque
+from app.cache import TTLCache
+from app.roadmap.single_flight import SingleFlight
+
+
+class FeedRing:
+    """The newest serialized posts of the global feed, kept in memory.
+
+    Entries are {'_id', 'created_at', 'data'} with `data` being the per-user
+    independent part of a feed item. The ring is rebuilt from Mongo when it is
+    older than `ttl` seconds, which also bounds staleness for writes made by
+    other processes. One request at a time rebuilds; the others wait for it.
+    Pushes and count patches that land during the load are replayed onto the
+    new entries, so only an invalidate() makes a rebuild start over.
+    """
+
+    def __init__(self, size=200, ttl=30):
+        self.size = size
+        self.ttl = ttl
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+        self.discarded = 0
+        self._generation = 0
+        self._replay = None
+        self._flights = SingleFlight()
+        self._entries = deque()
+        self._complete = False
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        # Versions are per process, so ETags carry the process too
+        self._instance = uuid.uuid4().hex[:8]
+
+    def init_app(self, app):
+        self.size = app.config['FEED_RING_SIZE']
+        self.ttl = app.config['FEED_RING_TTL']
+
+    def _fresh(self):
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl
+
+    def first_page(self, limit, load):
+        """Return the newest `limit` entries, or None if Mongo must answer instead.
+
+        `load(n)` must return the newest n entries in feed order.
+        """
+        if not self._fresh():
+            self._flights.do('rebuild', lambda: self._rebuild(load))
+
+        entries = self._entries
+        if not self._fresh() or (limit > len(entries) and not self._complete):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return list(entries)[:limit]
+
+    def _rebuild(self, load):
+        with self._lock:
+            generation = self._generation
+            self._replay = []
+        try:
+            entries = deque(load(self.size))
+        except BaseException:
+            with self._lock:
+                self._replay = None
+            raise
+
+        with self._lock:
+            replay, self._replay = self._replay, None
+            if self._generation != generation:
+                # Invalidated while we were reading; the next request tries again
+                self.discarded += 1
+                return
+
+            for op, *args in replay:
+                if op == 'push':
+                    self._push(entries, *args)
+                else:
+                    self._update(entries, *args)
+            self._entries = entries
+            self._complete = len(entries) < self.size
+            self._loaded_at = time.monotonic()
+            self.version += 1
+            self.rebuilds += 1
+
+    def etag(self):
+        # None while a rebuild is due: the next first_page may change the entries
+        if not self._fresh():
+            return None
+        return f"{self._instance}-{self.version}"
+
+    def touch(self):
+        with self._lock:
+            self.version += 1
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+            self._generation += 1
+            self.version += 1
+
+    def _push(self, entries, entry):
+        # A replayed push may already be in a load that read after it
+        if any(e['_id'] == entry['_id'] for e in entries):
+            return
+        entries.appendleft(entry)
+        while len(entries) > self.size:
+            entries.pop()
+            self._complete = False
+
+    def _update(self, entries, post_id, func):
+        for entry in entries:
+            if entry['_id'] == post_id:
+                func(entry['data'])
+                return True
+        return False
+
+    def push(self, entry):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(('push', entry))
+            self._push(self._entries, entry)
+            self.version += 1
+
+    def update(self, post_id, func):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(('update', post_id, func))
+            # Posts outside the ring are not on the first page, so its ETag stands
+            if self._update(self._entries, post_id, func):
+                self.version += 1
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'capacity': self.size,
+            'ttl': self.ttl,
+            'version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'rebuilds': self.rebuilds,
+            'discarded_rebuilds': self.discarded
+        }
+
+
+feed_ring = FeedRing()
+originals_cache = TTLCache(maxsize=5000, ttl=300)
@@ -1,10 +1,124 @@
 from flask import request, jsonify
 from app.social import social_bp
 from app import mongo, socketio
-from app.utils import token_required
+from app.utils import token_required, update_user
+from app.loader import get_loader
+from app.pagination import encode_cursor, keyset_filter, InvalidCursor
+from app.social.feed_cache import feed_ring, originals_cache
+from app.social.timeline import timelines
+from app.social.chat_writer import chat_writer
+from app.social.emitter import emitter
+from app.invalidation import invalidation_bus
+from app.conditional import etag
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import datetime
 
+COMMENT_PREVIEW_SIZE = 3
+FEED_PROJECTION = {'likes': 0, 'comments': 0}
+ORIGINAL_PROJECTION = {'author_name': 1, 'content': 1}
+
+def _serialize_comment(comment):
+    return {
+        'id': comment['_id'],
+        'user_id': comment['user_id'],
+        'author_name': comment['author_name'],
+        'text': comment['text'],
+        'created_at': comment['created_at']
+    }
+
+def chat_room(user):
+    return user.get('career_goal') or 'General'
+
+def chat_socket_room(room):
+    return f"chat:{room}"
+
+FEED_SOCKET_ROOM = 'feed'
+
+def user_socket_room(user_id):
+    return f"user:{user_id}"
+
+def post_socket_room(post_id):
+    return f"post:{post_id}"
+
+def _serialize_chat_message(msg):
+    return {
+        'id': msg['_id'],
+        'author': msg['author_name'],
+        'user_id': msg['user_id'],
+        'content': msg['content'],
+        'created_at': msg['created_at'],
+        'cursor': encode_cursor(msg)
+    }
+
+def _feed_entry(post, original=None):
+    # Everything in a feed item except the per-user has_liked flag.
+    # Reposts only store original_post_id; `original` supplies the content.
+    if original:
+        content, original_author = original['content'], original['author_name']
+    else:
+        content, original_author = post.get('content'), post.get('original_author')
+
+    return {
+        '_id': post['_id'],
+        'created_at': post['created_at'],
+        'data': {
+            'id': post['_id'],
+            'author': post['author_name'],
+            'author_id': post['user_id'],
+            'content': content,
+            'created_at': post['created_at'],
+            'comments': [_serialize_comment(c) for c in post.get('recent_comments', [])],
+            'comments_count': post.get('comments_count', 0),
+            'likes_count': post.get('likes_count', 0),
+            'reposts_count': post.get('reposts', 0),
+            'is_repost': post.get('is_repost', False),
+            'original_author': original_author
+        }
+    }
+
+def _feed_entries(posts):
+    posts = list(posts)
+    original_ids = {post['original_post_id'] for post in posts if post.get('original_post_id')}
+
+    originals = {}
+    missing = []
+    for original_id in original_ids:
+        original = originals_cache.get(original_id)
+        if original is None:
+            missing.append(original_id)
+        else:
+            originals[original_id] = original
+
+    if missing:
+        for original in mongo.db.posts.find({'_id': {'$in': missing}}, ORIGINAL_PROJECTION):
+            originals_cache.set(original['_id'], original)
+            originals[original['_id']] = original
+
+    return [_feed_entry(post, originals.get(post.get('original_post_id'))) for post in posts]
+
+def _load_feed_entries(limit):
+    return _feed_entries(mongo.db.posts.find({}, FEED_PROJECTION).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+
+def _feed_items(entries, current_user):
+    liked_ids = set()
+    if entries:
+        liked_ids = {
+            like['post_id'] for like in mongo.db.likes.find(
+                {'post_id': {'$in': [entry['_id'] for entry in entries]}, 'user_id': current_user['_id']},
+                {'post_id': 1}
+            )
+        }
+    return [dict(entry['data'], has_liked=entry['_id'] in liked_ids) for entry in entries]
+
+def _emit_counts(post_id, **counts):
+    # Later counts for the same post and field replace queued ones
+    field = next(iter(counts))
+    emitter.emit('post_counts', dict(counts, post_id=post_id),
+                 to=post_socket_room(post_id), key=f"{post_id}:{field}")
+
 @social_bp.route('/posts', methods=['POST'])
 @token_required
 def create_post(current_user):
@@ -16,94 +130,226 @@ def create_post(current_user):
     if len(data['content']) > 500:
          return jsonify({'message': 'Post too long (max 500 chars)'}), 400
 
-    post_id = mongo.db.posts.insert_one({
+    post = {
         'user_id': current_user['_id'],
         'author_name': current_user['name'],
         'content': data['content'],
         'created_at': datetime.datetime.utcnow(),
-        'comments': [],
-        'likes': [],
+        'comments_count': 0,
+        'recent_comments': [],
+        'likes_count': 0,
         'reposts': 0,
         'is_repost': False
-    }).inserted_id
-    
-    socketio.emit('new_post', {
-        'content': data['content'], 
-        'author': current_user['name'],
-        'id': str(post_id),
-        'likes_count': 0,
-        'comments_count': 0
-    })
+    }
+    post_id = mongo.db.posts.insert_one(post).inserted_id
+    entry = _feed_entry(post)
+    feed_ring.push(entry)
+    invalidation_bus.publish('feed_ring')
+    socketio.start_background_task(timelines.fan_out, post, current_user)
+
+    item = dict(entry['data'], has_liked=False)
+    emitter.emit('new_post', item, to=FEED_SOCKET_ROOM)
 
-    return jsonify({'message': 'Post created', 'post_id': str(post_id)}), 201
+    return jsonify({'message': 'Post created', 'post_id': post_id, 'post': item}), 201
 
 @social_bp.route('/posts/<post_id>/like', methods=['POST'])
 @token_required
 def like_post(current_user, post_id):
-    user_id = current_user['_id']
-    
-    post = mongo.db.posts.find_one({'_id': ObjectId(post_id)})
+    try:
+        like = {'post_id': ObjectId(post_id), 'user_id': current_user['_id']}
+    except InvalidId:
+        return jsonify({'message': 'Invalid post id'}), 400
+
+    # The unique (post_id, user_id) index turns the insert into the toggle test.
+    # The counter only moves by the rows this request actually added or removed,
+    # so a concurrent toggle that already deleted the like leaves it alone.
+    try:
+        mongo.db.likes.insert_one(dict(like, created_at=datetime.datetime.utcnow()))
+        liked, delta = True, 1
+    except DuplicateKeyError:
+        deleted = mongo.db.likes.delete_one(like).deleted_count
+        liked, delta = False, -deleted
+
+    post = mongo.db.posts.find_one_and_update(
+        {'_id': like['post_id']},
+        {'$inc': {'likes_count': delta}},
+        projection={'likes_count': 1},
+        return_document=ReturnDocument.AFTER
+    )
     if not post:
+        mongo.db.likes.delete_one(like)
         return jsonify({'message': 'Post not found'}), 404
-        
-    if user_id in post.get('likes', []):
-        mongo.db.posts.update_one({'_id': ObjectId(post_id)}, {'$pull': {'likes': user_id}})
-        liked = False
-    else:
-        mongo.db.posts.update_one({'_id': ObjectId(post_id)}, {'$addToSet': {'likes': user_id}})
-        liked = True
-        
-    updated_post = mongo.db.posts.find_one({'_id': ObjectId(post_id)})
-    likes_count = len(updated_post.get('likes', []))
-    
-    return jsonify({'message': 'Success', 'liked': liked, 'likes_count': likes_count}), 200
+
+    feed_ring.update(post['_id'], lambda item: item.update(likes_count=post['likes_count']))
+    invalidation_bus.publish('feed_touch')
+    _emit_counts(post['_id'], likes_count=post['likes_count'])
+    emitter.emit('post_liked', {'post_id': post['_id'], 'liked': liked},
+                 to=user_socket_room(current_user['_id']), key=str(post['_id']))
+
+    return jsonify({'message': 'Success', 'liked': liked, 'likes_count': post['likes_count']}), 200
 
 @social_bp.route('/posts/<post_id>/repost', methods=['POST'])
 @token_required
 def repost(current_user, post_id):
-    original_post = mongo.db.posts.find_one({'_id': ObjectId(post_id)})
+    try:
+        original_post = get_loader().load('posts', ObjectId(post_id))
+    except InvalidId:
+        return jsonify({'message': 'Invalid post id'}), 400
     if not original_post:
         return jsonify({'message': 'Original post not found'}), 404
 
-    new_post_id = mongo.db.posts.insert_one({
+    # Reposts of reposts point at the root post
+    if original_post.get('original_post_id'):
+        original_post = get_loader().load('posts', original_post['original_post_id'])
+        if not original_post:
+            return jsonify({'message': 'Original post not found'}), 404
+
+    new_post = {
         'user_id': current_user['_id'],
         'author_name': current_user['name'],
-        'content': original_post['content'],
-        'original_author': original_post['author_name'],
-        'original_post_id': ObjectId(post_id),
+        'original_post_id': original_post['_id'],
         'created_at': datetime.datetime.utcnow(),
-        'comments': [],
-        'likes': [],
+        'comments_count': 0,
+        'recent_comments': [],
+        'likes_count': 0,
         'reposts': 0,
         'is_repost': True
-    }).inserted_id
+    }
+    new_post_id = mongo.db.posts.insert_one(new_post).inserted_id
+    entry = _feed_entry(new_post, original_post)
+    feed_ring.push(entry)
+    invalidation_bus.publish('feed_ring')
+    socketio.start_background_task(timelines.fan_out, new_post, current_user)
+    item = dict(entry['data'], has_liked=False)
+    emitter.emit('new_post', item, to=FEED_SOCKET_ROOM)
 
-    mongo.db.posts.update_one({'_id': ObjectId(post_id)}, {'$inc': {'reposts': 1}})
+    counted = mongo.db.posts.find_one_and_update(
+        {'_id': original_post['_id']},
+        {'$inc': {'reposts': 1}},
+        projection={'reposts': 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if counted:
+        feed_ring.update(counted['_id'], lambda item: item.update(reposts_count=counted['reposts']))
+        invalidation_bus.publish('feed_touch')
+        _emit_counts(counted['_id'], reposts_count=counted['reposts'])
+
+    return jsonify({
+        'message': 'Reposted successfully',
+        'post_id': new_post_id,
+        'post': item,
+        'original_post_id': original_post['_id'],
+        'reposts_count': counted['reposts'] if counted else None
+    }), 201
 
-    return jsonify({'message': 'Reposted successfully', 'post_id': str(new_post_id)}), 201
+def _feed_version(current_user):
+    # Only the newest page is served from the ring, so only it is tagged.
+    # Likes bump the ring version too, which keeps has_liked honest.
+    if request.args.get('before') or request.args.get('after'):
+        return None
+    version = feed_ring.etag()
+    return version and f"feed-{current_user['_id']}-{version}"
 
 @social_bp.route('/feed', methods=['GET'])
 @token_required
+@etag(_feed_version)
 def get_feed(current_user):
-    posts = mongo.db.posts.find().sort('created_at', -1).limit(20)
-    output = []
-    
-    for post in posts:
-        post_data = {
-            'id': str(post['_id']),
-            'author': post['author_name'],
-            'content': post['content'],
-            'created_at': post['created_at'].isoformat(),
-            'comments': post.get('comments', []),
-            'likes_count': len(post.get('likes', [])),
-            'has_liked': current_user['_id'] in post.get('likes', []),
-            'reposts_count': post.get('reposts', 0),
-            'is_repost': post.get('is_repost', False),
-            'original_author': post.get('original_author')
-        }
-        output.append(post_data)
-        
-    return jsonify({'feed': output}), 200
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    before = request.args.get('before')
+    after = request.args.get('after')
+
+    try:
+        if after:
+            query, direction = keyset_filter(after, '$gt'), 1
+        elif before:
+            query, direction = keyset_filter(before, '$lt'), -1
+        else:
+            query, direction = {}, -1
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+
+    # The newest page is identical for everyone, so it comes from memory
+    entries = None
+    if not before and not after:
+        entries = feed_ring.first_page(limit, _load_feed_entries)
+
+    if entries is None:
+        posts = mongo.db.posts.find(query, FEED_PROJECTION).sort([('created_at', direction), ('_id', direction)]).limit(limit)
+        entries = _feed_entries(posts)
+        if after:
+            entries.reverse()
+
+    output = _feed_items(entries, current_user)
+
+    next_cursor = encode_cursor(entries[-1]) if len(entries) == limit and not after else None
+    prev_cursor = encode_cursor(entries[0]) if entries else after
+
+    return jsonify({'feed': output, 'next_cursor': next_cursor, 'prev_cursor': prev_cursor}), 200
+
+@social_bp.route('/timeline', methods=['GET'])
+@token_required
+def get_timeline(current_user):
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    before = request.args.get('before')
+
+    try:
+        posts = timelines.read(current_user['_id'], limit, before)
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+
+    entries = _feed_entries(posts)
+    next_cursor = encode_cursor(entries[-1]) if len(entries) == limit else None
+
+    return jsonify({'feed': _feed_items(entries, current_user), 'next_cursor': next_cursor}), 200
+
+@social_bp.route('/users/<user_id>/follow', methods=['POST'])
+@token_required
+def follow_user(current_user, user_id):
+    try:
+        followee = get_loader().load('users', ObjectId(user_id))
+    except InvalidId:
+        return jsonify({'message': 'Invalid user id'}), 400
+    if not followee:
+        return jsonify({'message': 'User not found'}), 404
+
+    if followee['_id'] == current_user['_id']:
+        return jsonify({'message': 'You cannot follow yourself'}), 400
+
+    try:
+        mongo.db.follows.insert_one({
+            'follower_id': current_user['_id'],
+            'followee_id': followee['_id'],
+            'created_at': datetime.datetime.utcnow()
+        })
+    except DuplicateKeyError:
+        return jsonify({'message': 'Already following'}), 200
+
+    update_user(current_user['_id'], {'$inc': {'following_count': 1}})
+    update_user(followee['_id'], {'$inc': {'followers_count': 1}})
+    timelines.backfill(current_user['_id'], followee)
+
+    return jsonify({'message': 'Followed'}), 201
+
+@social_bp.route('/users/<user_id>/follow', methods=['DELETE'])
+@token_required
+def unfollow_user(current_user, user_id):
+    try:
+        followee_id = ObjectId(user_id)
+    except InvalidId:
+        return jsonify({'message': 'Invalid user id'}), 400
+
+    result = mongo.db.follows.delete_one({
+        'follower_id': current_user['_id'],
+        'followee_id': followee_id
+    })
+    if result.deleted_count == 0:
+        return jsonify({'message': 'Not following'}), 404
+
+    update_user(current_user['_id'], {'$inc': {'following_count': -1}})
+    update_user(followee_id, {'$inc': {'followers_count': -1}})
+    timelines.remove_author(current_user['_id'], followee_id)
+
+    return jsonify({'message': 'Unfollowed'}), 200
 
 @social_bp.route('/posts/<post_id>/comment', methods=['POST'])
 @token_required
@@ -113,46 +359,115 @@ def add_comment(current_user, post_id):
     if not data or not data.get('text'):
         return jsonify({'message': 'Comment text is required'}), 400
         
+    try:
+        post_oid = ObjectId(post_id)
+    except InvalidId:
+        return jsonify({'message': 'Invalid post id'}), 400
+
     comment = {
-        'user_id': str(current_user['_id']),
+        '_id': ObjectId(),
+        'post_id': post_oid,
+        'user_id': current_user['_id'],
         'author_name': current_user['name'],
         'text': data['text'],
-        'created_at': datetime.datetime.utcnow().isoformat()
+        'created_at': datetime.datetime.utcnow()
     }
-    
-    result = mongo.db.posts.update_one(
-        {'_id': ObjectId(post_id)},
-        {'$push': {'comments': comment}}
+
+    # Stored first, so the counter and preview never point at a missing comment.
+    # The post keeps only a bounded preview; the full history lives in comments.
+    mongo.db.comments.insert_one(comment)
+    post = mongo.db.posts.find_one_and_update(
+        {'_id': comment['post_id']},
+        {
+            '$inc': {'comments_count': 1},
+            '$push': {'recent_comments': {'$each': [comment], '$slice': -COMMENT_PREVIEW_SIZE}}
+        },
+        projection={'comments_count': 1, 'recent_comments': 1},
+        return_document=ReturnDocument.AFTER
     )
     
-    if result.modified_count == 0:
+    if not post:
+        mongo.db.comments.delete_one({'_id': comment['_id']})
         return jsonify({'message': 'Post not found'}), 404
+
+    feed_ring.update(post['_id'], lambda item: item.update(
+        comments_count=post['comments_count'],
+        comments=[_serialize_comment(c) for c in post['recent_comments']]
+    ))
+    invalidation_bus.publish('feed_touch')
         
-    socketio.emit('new_comment', {'post_id': post_id, 'comment': comment})
+    event = {
+        'post_id': post['_id'],
+        'comments_count': post['comments_count'],
+        'comment': _serialize_comment(comment)
+    }
+    emitter.emit('new_comment', event, to=post_socket_room(post['_id']))
+
+    return jsonify(dict(event, message='Comment added')), 201
+
+@social_bp.route('/posts/<post_id>/comments', methods=['GET'])
+@token_required
+def get_comments(current_user, post_id):
+    limit = max(1, min(request.args.get('limit', 20, type=int), 50))
+    before = request.args.get('before')
+
+    try:
+        query = {'post_id': ObjectId(post_id)}
+    except InvalidId:
+        return jsonify({'message': 'Invalid post id'}), 400
 
-    return jsonify({'message': 'Comment added'}), 201
+    if before:
+        try:
+            query.update(keyset_filter(before, '$lt'))
+        except InvalidCursor as e:
+            return jsonify({'message': str(e)}), 400
+
+    comments = list(mongo.db.comments.find(query).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+    next_cursor = encode_cursor(comments[-1]) if len(comments) == limit else None
+
+    return jsonify({
+        'comments': [_serialize_comment(c) for c in comments],
+        'next_cursor': next_cursor
+    }), 200
 
 @social_bp.route('/chat', methods=['GET'])
 @token_required
 def get_chat_messages(current_user):
-    room = current_user.get('career_goal', 'General')
-    if not room:
-        room = 'General'
-        
-    messages = mongo.db.chat_messages.find({'room': room}).sort('created_at', 1).limit(50)
+    room = chat_room(current_user)
+    limit = max(1, min(request.args.get('limit', 50, type=int), 100))
+    since = request.args.get('since')
+    before = request.args.get('before')
+
+    # ObjectIds only order by second (and not at all across workers), so pages
+    # are keyed on the (created_at, _id) cursor and read off (room, created_at, _id)
+    query = {'room': room}
+    try:
+        if since:
+            query.update(keyset_filter(since, '$gt'))
+        elif before:
+            query.update(keyset_filter(before, '$lt'))
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+
+    if since:
+        messages = list(mongo.db.chat_messages.find(query).sort([('created_at', 1), ('_id', 1)]).limit(limit))
+    else:
+        messages = list(mongo.db.chat_messages.find(query).sort([('created_at', -1), ('_id', -1)]).limit(limit))
+        messages.reverse()
     output = []
     
     for msg in messages:
-        output.append({
-            'id': str(msg['_id']),
-            'author': msg['author_name'],
-            'user_id': str(msg['user_id']),
-            'content': msg['content'],
-            'created_at': msg['created_at'].isoformat(),
-            'is_me': str(msg['user_id']) == str(current_user['_id'])
-        })
+        output.append(dict(
+            _serialize_chat_message(msg),
+            is_me=msg['user_id'] == current_user['_id']
+        ))
         
-    return jsonify({'room': room, 'messages': output}), 200
+    return jsonify({
+        'room': room,
+        'user_id': current_user['_id'],
+        'messages': output,
+        'has_more': len(messages) == limit
+    }), 200
 
 @social_bp.route('/chat', methods=['POST'])
 @token_required
@@ -161,18 +476,19 @@ def send_chat_message(current_user):
     if not data or not data.get('content'):
         return jsonify({'message': 'Content required'}), 400
         
-    room = current_user.get('career_goal', 'General')
-    if not room:
-        room = 'General'
-        
+    room = chat_room(current_user)
+
+    # Mongo keeps milliseconds; truncate so the pushed cursor matches the stored one
+    now = datetime.datetime.utcnow()
     message = {
         'room': room,
         'user_id': current_user['_id'],
         'author_name': current_user['name'],
         'content': data['content'],
-        'created_at': datetime.datetime.utcnow()
+        'created_at': now.replace(microsecond=now.microsecond // 1000 * 1000)
     }
     
-    mongo.db.chat_messages.insert_one(message)
+    chat_writer.write(message)
+    socketio.emit('chat_message', _serialize_chat_message(message), to=chat_socket_room(room))
     
-    return jsonify({'message': 'Sent'}), 201
+    return jsonify({'message': 'Sent', 'id': message['_id']}), 201
@@ -0,0 +1,105 @@
+from pymongo import InsertOne
+from app import mongo
+from app.cache import TTLCache
+from app.loader import get_loader
+from app.pagination import keyset_filter
+
+FANOUT_BATCH_SIZE = 500
+
+
+class TimelineStore:
+    """Personal timelines: fan-out on write, fan-out on read for big accounts.
+
+    Posts by authors with at most `fanout_limit` followers are copied as
+    {user_id, post_id, author_id, created_at} references into each follower's
+    timeline when they are written. Posts by larger accounts are not copied;
+    readers pull them from `posts` and merge them in.
+    """
+
+    def __init__(self):
+        self.fanout_limit = 1000
+        self.backfill_size = 20
+        self._celebrities = TTLCache(maxsize=1, ttl=60)
+
+    def init_app(self, app):
+        self.fanout_limit = app.config['FANOUT_FOLLOWER_LIMIT']
+        self.backfill_size = app.config['TIMELINE_BACKFILL_SIZE']
+
+    def fans_out(self, user):
+        return user.get('followers_count', 0) <= self.fanout_limit
+
+    def fan_out(self, post, author):
+        """Write `post` into the author's and, for small accounts, followers' timelines."""
+        entry = {'post_id': post['_id'], 'author_id': post['user_id'], 'created_at': post['created_at']}
+        mongo.db.timelines.insert_one(dict(entry, user_id=post['user_id']))
+        if not self.fans_out(author):
+            return
+
+        batch = []
+        for follow in mongo.db.follows.find({'followee_id': post['user_id']}, {'follower_id': 1}):
+            batch.append(InsertOne(dict(entry, user_id=follow['follower_id'])))
+            if len(batch) >= FANOUT_BATCH_SIZE:
+                mongo.db.timelines.bulk_write(batch, ordered=False)
+                batch = []
+        if batch:
+            mongo.db.timelines.bulk_write(batch, ordered=False)
+
+    def backfill(self, user_id, followee):
+        if not self.fans_out(followee):
+            return
+
+        posts = mongo.db.posts.find(
+            {'user_id': followee['_id']}, {'user_id': 1, 'created_at': 1}
+        ).sort([('created_at', -1), ('_id', -1)]).limit(self.backfill_size)
+        entries = [
+            {'user_id': user_id, 'post_id': post['_id'], 'author_id': post['user_id'], 'created_at': post['created_at']}
+            for post in posts
+        ]
+        if entries:
+            mongo.db.timelines.insert_many(entries, ordered=False)
+
+    def remove_author(self, user_id, author_id):
+        mongo.db.timelines.delete_many({'user_id': user_id, 'author_id': author_id})
+
+    def _pulled_authors(self, user_id):
+        celebrities = self._celebrities.get('ids')
+        if celebrities is None:
+            celebrities = [
+                user['_id'] for user in
+                mongo.db.users.find({'followers_count': {'$gt': self.fanout_limit}}, {'_id': 1})
+            ]
+            self._celebrities.set('ids', celebrities)
+
+        if not celebrities:
+            return []
+        return [
+            follow['followee_id'] for follow in
+            mongo.db.follows.find({'follower_id': user_id, 'followee_id': {'$in': celebrities}}, {'followee_id': 1})
+        ]
+
+    def read(self, user_id, limit, before=None):
+        query = {'user_id': user_id}
+        if before:
+            query.update(keyset_filter(before, '$lt', id_field='post_id'))
+        refs = {
+            (entry['created_at'], entry['post_id']) for entry in
+            mongo.db.timelines.find(query, {'post_id': 1, 'created_at': 1})
+            .sort([('created_at', -1), ('post_id', -1)]).limit(limit)
+        }
+
+        pulled = self._pulled_authors(user_id)
+        if pulled:
+            query = {'user_id': {'$in': pulled}}
+            if before:
+                query.update(keyset_filter(before, '$lt'))
+            refs.update(
+                (post['created_at'], post['_id']) for post in
+                mongo.db.posts.find(query, {'created_at': 1}).sort([('created_at', -1), ('_id', -1)]).limit(limit)
+            )
+
+        post_ids = [post_id for _, post_id in sorted(refs, reverse=True)[:limit]]
+        posts = get_loader().load_many('posts', post_ids)
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+timelines = TimelineStore()
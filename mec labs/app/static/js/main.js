@@ -136,20 +136,104 @@ async function handleRegister(e) {
 const token = localStorage.getItem('token');
 const user = localStorage.getItem('user');
 
-let chatPollInterval = null;
+// url -> { etag, data } for GETs the server tags with version-based ETags
+const etagCache = new Map();
+
+// GET JSON, revalidating with If-None-Match; a 304 reuses the stored body
+async function fetchJSON(url) {
+    const cached = etagCache.get(url);
+    const headers = { 'Authorization': `Bearer ${localStorage.getItem('token')}` };
+    if (cached) headers['If-None-Match'] = cached.etag;
+
+    const res = await fetch(url, { headers, cache: 'no-store' });
+    if (res.status === 304 && cached) return cached.data;
+    if (!res.ok) throw new Error(`Server Error: ${res.statusText}`);
+
+    const data = await res.json();
+    const etag = res.headers.get('ETag');
+    if (etag) etagCache.set(url, { etag, data });
+    else etagCache.delete(url);
+    return data;
+}
+
+let socket = null;
+let chatUserId = null;
+let chatOldestCursor = null;
+let chatNewestCursor = null;
+
+function getSocket() {
+    if (!socket && typeof io !== 'undefined') {
+        // WebSocket only: any worker can own the connection, so no sticky sessions are needed
+        socket = io({ transports: ['websocket'], auth: { token } });
+        socket.on('connect', () => {
+            if (feedTopics.size) socket.emit('subscribe', { topics: [...feedTopics] });
+            // Rooms do not survive a reconnect, so rejoin if the chat is open
+            const chatNav = document.getElementById('nav-chat');
+            if (chatNav && chatNav.classList.contains('active')) {
+                joinChatRoom();
+                catchUpChat();
+            }
+        });
+        socket.on('chat_joined', data => { chatUserId = data.user_id; });
+        socket.on('chat_message', appendCommunityMessage);
+        // The server coalesces feed events into one frame per window
+        socket.on('batch', events => events.forEach(({ event, data }) => {
+            if (socketHandlers[event]) socketHandlers[event](data);
+        }));
+        Object.entries(socketHandlers).forEach(([event, handler]) => socket.on(event, handler));
+    }
+    return socket;
+}
+
+const socketHandlers = {
+    new_post: prependFeedPost,
+    new_comment: appendLiveComment,
+    post_counts: patchPostCounts,
+    post_liked: patchLiked
+};
+
+// Topic rooms this page listens to: 'feed' plus one 'post:<id>' per rendered card
+const feedTopics = new Set();
+
+function subscribeFeed(postIds) {
+    const feedNav = document.getElementById('nav-feed');
+    if (!feedNav || !feedNav.classList.contains('active')) return;
+
+    const topics = ['feed', ...postIds.map(id => `post:${id}`)].filter(t => !feedTopics.has(t));
+    if (!topics.length) return;
+    topics.forEach(t => feedTopics.add(t));
+    const s = getSocket();
+    if (s && s.connected) s.emit('subscribe', { topics });
+}
+
+function feedCardIds() {
+    return [...document.querySelectorAll('.feed-container .social-post-card')].map(card => card.id.replace('post-', ''));
+}
+
+function unsubscribeFeed() {
+    if (!feedTopics.size) return;
+    feedTopics.clear();
+    if (socket && socket.connected) socket.emit('unsubscribe');
+}
 
-function startChatPolling() {
-    if (chatPollInterval) clearInterval(chatPollInterval);
-    loadChat(true);
-    chatPollInterval = setInterval(() => loadChat(true), 5000);
+function joinChatRoom() {
+    const s = getSocket();
+    if (s && s.connected) s.emit('join_chat');
 }
 
-function stopChatPolling() {
-    if (chatPollInterval) clearInterval(chatPollInterval);
-    chatPollInterval = null;
+function leaveChatRoom() {
+    if (socket && socket.connected) socket.emit('leave_chat');
 }
 
 async function switchView(view) {
+    // Live patches only touch the DOM, so keep them when leaving the feed
+    const feedNav = document.getElementById('nav-feed');
+    if (view !== 'feed' && feedNav && feedNav.classList.contains('active') && document.querySelector('.feed-container')) {
+        viewCache.feed = document.getElementById('dynamic-content').innerHTML;
+        // The snapshot may hold several pages, so its cursor goes with it
+        viewCache.feedCursor = feedNextCursor;
+    }
+
     document.querySelectorAll('.nav-links button').forEach(b => b.classList.remove('active'));
     document.querySelectorAll('.sidebar-links a').forEach(a => a.classList.remove('active'));
     const navBtn = document.getElementById(`nav-${view}`);
@@ -161,11 +245,17 @@ async function switchView(view) {
 
     const content = document.getElementById('dynamic-content');
 
-    if (view !== 'chat') stopChatPolling();
+    if (view !== 'chat') leaveChatRoom();
+    if (view !== 'feed') unsubscribeFeed();
 
     if (viewCache[view] && view !== 'chat') {
         content.innerHTML = viewCache[view];
-        if (view === 'feed') loadFeed(false);
+        if (view === 'feed') {
+            if (viewCache.feedCursor !== undefined) feedNextCursor = viewCache.feedCursor;
+            // Cards from "Load more" and live pushes need their topics back too
+            subscribeFeed(feedCardIds());
+            loadFeed(false);
+        }
         if (view === 'opportunities') loadOpportunities(false);
         if (view === 'roadmaps') loadRoadmap(false);
     } else {
@@ -175,7 +265,8 @@ async function switchView(view) {
         if (view === 'roadmaps') await loadRoadmap(true);
         if (view === 'chat') {
             content.innerHTML = '<div class="glass-card" style="text-align:center; padding:20px;">Connecting to Community...</div>';
-            startChatPolling();
+            joinChatRoom();
+            loadChat();
         }
     }
 }
@@ -217,7 +308,80 @@ function getSkeletonUI(view) {
     return html;
 }
 
-async function loadChat(fromPoll = false) {
+function renderCommunityMessage(msg) {
+    return `
+        <div id="chat-msg-${msg.id}" style="align-self: ${msg.is_me ? 'flex-end' : 'flex-start'}; max-width:75%; margin-bottom:5px; animation: fadeIn 0.3s ease;">
+             <div style="font-size:0.75rem; margin-bottom:4px; color:var(--text-muted); text-align:${msg.is_me ? 'right' : 'left'};">
+                ${msg.is_me ? 'You' : msg.author}
+             </div>
+             <div style="
+                padding:10px 15px; 
+                border-radius:12px; 
+                background: ${msg.is_me ? 'var(--primary-color)' : 'var(--input-bg)'}; 
+                color: ${msg.is_me ? 'white' : 'var(--text-color)'};
+                border-bottom-${msg.is_me ? 'right' : 'left'}-radius: 2px;
+                border: 1px solid ${msg.is_me ? 'transparent' : 'var(--input-border)'};
+                box-shadow: 0 2px 5px rgba(0,0,0,0.05);
+             ">
+                ${msg.content}
+             </div>
+        </div>
+    `;
+}
+
+function appendCommunityMessage(msg) {
+    const container = document.getElementById('community-messages');
+    if (!container || document.getElementById(`chat-msg-${msg.id}`)) return;
+
+    const empty = document.getElementById('community-empty');
+    if (empty) empty.remove();
+
+    const wasAtBottom = container.scrollHeight - container.scrollTop <= container.clientHeight + 5;
+    container.insertAdjacentHTML('beforeend', renderCommunityMessage({ ...msg, is_me: msg.user_id === chatUserId }));
+    if (wasAtBottom) container.scrollTop = container.scrollHeight;
+    chatNewestCursor = msg.cursor;
+}
+
+async function fetchChat(params = '') {
+    const res = await fetch(`${API_URL}/social/chat${params}`, {
+        headers: { 'Authorization': `Bearer ${token}` }
+    });
+    if (!res.ok) throw new Error(`Server Error: ${res.statusText}`);
+    return res.json();
+}
+
+// Fetch only what was sent while the socket was away
+async function catchUpChat() {
+    if (!chatNewestCursor) return;
+    try {
+        let data;
+        do {
+            data = await fetchChat(`?since=${encodeURIComponent(chatNewestCursor)}`);
+            data.messages.forEach(appendCommunityMessage);
+            if (data.messages.length) chatNewestCursor = data.messages[data.messages.length - 1].cursor;
+        } while (data.has_more && data.messages.length);
+    } catch (err) { console.error(err); }
+}
+
+async function loadEarlierChat() {
+    const container = document.getElementById('community-messages');
+    if (!container || !chatOldestCursor) return;
+
+    try {
+        const data = await fetchChat(`?before=${encodeURIComponent(chatOldestCursor)}`);
+        const previousHeight = container.scrollHeight;
+        const more = document.getElementById('community-load-earlier');
+        const html = data.messages.map(renderCommunityMessage).join('');
+        if (more) more.insertAdjacentHTML('afterend', html);
+        else container.insertAdjacentHTML('afterbegin', html);
+        container.scrollTop += container.scrollHeight - previousHeight;
+
+        if (data.messages.length) chatOldestCursor = data.messages[0].cursor;
+        if (!data.has_more && more) more.remove();
+    } catch (err) { console.error(err); }
+}
+
+async function loadChat() {
     // Only update if chat is active
     if (!document.getElementById('nav-chat').classList.contains('active')) return;
 
@@ -240,8 +404,11 @@ async function loadChat(fromPoll = false) {
         const data = await res.json();
         const room = data.room;
         const messages = data.messages;
+        chatUserId = data.user_id;
+        chatOldestCursor = messages.length ? messages[0].cursor : null;
+        chatNewestCursor = messages.length ? messages[messages.length - 1].cursor : null;
 
-        let html = `
+        const html = `
             <div class="glass-card" style="height: calc(100vh - 140px); display:flex; flex-direction:column; padding:0; overflow:hidden;">
                 <div style="padding:15px; border-bottom:1px solid var(--input-border); background:rgba(0,0,0,0.2);">
                     <h3 style="margin:0; color:var(--primary-color); font-size:1.2rem;"><i class="fas fa-users"></i> ${room} Community</h3>
@@ -249,25 +416,9 @@ async function loadChat(fromPoll = false) {
                 </div>
                 
                 <div id="community-messages" style="flex:1; overflow-y:auto; padding:20px; display:flex; flex-direction:column; gap:10px;">
-                    ${messages.length === 0 ? '<div style="text-align:center; color:#ccc; margin-top:20px;">No messages yet. Be the first to say hello!</div>' : ''}
-                    ${messages.map(msg => `
-                        <div style="align-self: ${msg.is_me ? 'flex-end' : 'flex-start'}; max-width:75%; margin-bottom:5px; animation: fadeIn 0.3s ease;">
-                             <div style="font-size:0.75rem; margin-bottom:4px; color:var(--text-muted); text-align:${msg.is_me ? 'right' : 'left'};">
-                                ${msg.is_me ? 'You' : msg.author}
-                             </div>
-                             <div style="
-                                padding:10px 15px; 
-                                border-radius:12px; 
-                                background: ${msg.is_me ? 'var(--primary-color)' : 'var(--input-bg)'}; 
-                                color: ${msg.is_me ? 'white' : 'var(--text-color)'};
-                                border-bottom-${msg.is_me ? 'right' : 'left'}-radius: 2px;
-                                border: 1px solid ${msg.is_me ? 'transparent' : 'var(--input-border)'};
-                                box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-                             ">
-                                ${msg.content}
-                             </div>
-                        </div>
-                    `).join('')}
+                    ${data.has_more ? '<div id="community-load-earlier" style="text-align:center;"><a href="#" style="color:var(--text-muted); font-size:0.85rem;" onclick="loadEarlierChat(); return false;">Load earlier messages</a></div>' : ''}
+                    ${messages.length === 0 ? '<div id="community-empty" style="text-align:center; color:#ccc; margin-top:20px;">No messages yet. Be the first to say hello!</div>' : ''}
+                    ${messages.map(renderCommunityMessage).join('')}
                 </div>
 
                 <div style="padding:15px; background:rgba(0,0,0,0.1); border-top:1px solid var(--input-border); display:flex; gap:10px;">
@@ -283,67 +434,21 @@ async function loadChat(fromPoll = false) {
         `;
 
         const content = document.getElementById('dynamic-content');
-        const msgContainer = document.getElementById('community-messages');
-
-        // Logic to update DOM
-        if (fromPoll && msgContainer) {
-            // If messages changed significantly, one could compare. 
-            // For now, simpler approach: Update innerHTML only if length changed or last message different?
-            // Since we polling, we don't want to kill input focus.
-            // We'll rebuild just the message list part.
-
-            // Extract message list HTML construction to match
-            const msgsHtml = messages.length === 0 ? '<div style="text-align:center; color:#ccc; margin-top:20px;">No messages yet. Be the first to say hello!</div>' :
-                messages.map(msg => `
-                <div style="align-self: ${msg.is_me ? 'flex-end' : 'flex-start'}; max-width:75%; margin-bottom:5px; animation: fadeIn 0.3s ease;">
-                     <div style="font-size:0.75rem; margin-bottom:4px; color:var(--text-muted); text-align:${msg.is_me ? 'right' : 'left'};">
-                        ${msg.is_me ? 'You' : msg.author}
-                     </div>
-                     <div style="
-                        padding:10px 15px; 
-                        border-radius:12px; 
-                        background: ${msg.is_me ? 'var(--primary-color)' : 'var(--input-bg)'}; 
-                        color: ${msg.is_me ? 'white' : 'var(--text-color)'};
-                        border-bottom-${msg.is_me ? 'right' : 'left'}-radius: 2px;
-                        border: 1px solid ${msg.is_me ? 'transparent' : 'var(--input-border)'};
-                        box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-                     ">
-                        ${msg.content}
-                     </div>
-                </div>
-            `).join('');
-
-            // Only update if content length is different (simple heuristic to avoid input lag on identical pol)
-            // Ideally use message IDs.
-            if (msgContainer.innerHTML.length !== msgsHtml.length) {
-                const wasAtBottom = msgContainer.scrollHeight - msgContainer.scrollTop === msgContainer.clientHeight;
-
-                msgContainer.innerHTML = msgsHtml;
-
-                if (wasAtBottom) msgContainer.scrollTop = msgContainer.scrollHeight;
-            }
-        } else {
-            // First load or hard refresh
-            content.innerHTML = html;
-            const newMsgContainer = document.getElementById('community-messages');
-            if (newMsgContainer) newMsgContainer.scrollTop = newMsgContainer.scrollHeight;
-        }
+        content.innerHTML = html;
+        const newMsgContainer = document.getElementById('community-messages');
+        if (newMsgContainer) newMsgContainer.scrollTop = newMsgContainer.scrollHeight;
 
     } catch (err) {
         console.error(err);
-        // Only show error on DOM if it's the initial load (prevent polling errors from wiping the screen)
-        if (!fromPoll || document.getElementById('dynamic-content').innerText.includes('Connecting')) {
-            document.getElementById('dynamic-content').innerHTML = `
-                <div class="glass-card" style="text-align:center; padding:30px; border-color:var(--secondary-color);">
-                    <i class="fas fa-exclamation-circle" style="font-size:3rem; color:var(--secondary-color); margin-bottom:15px;"></i>
-                    <h3>Connection Failed</h3>
-                    <p style="color:#cecece;">Could not load the chat room.</p>
-                    <p style="font-size:0.8rem; color:#aaa; margin-bottom:20px;">${err.message}</p>
-                    <button onclick="loadChat()" class="btn-primary">Retry</button>
-                </div>
-            `;
-            stopChatPolling();
-        }
+        document.getElementById('dynamic-content').innerHTML = `
+            <div class="glass-card" style="text-align:center; padding:30px; border-color:var(--secondary-color);">
+                <i class="fas fa-exclamation-circle" style="font-size:3rem; color:var(--secondary-color); margin-bottom:15px;"></i>
+                <h3>Connection Failed</h3>
+                <p style="color:#cecece;">Could not load the chat room.</p>
+                <p style="font-size:0.8rem; color:#aaa; margin-bottom:20px;">${err.message}</p>
+                <button onclick="loadChat()" class="btn-primary">Retry</button>
+            </div>
+        `;
     }
 }
 
@@ -364,7 +469,8 @@ async function sendCommunityMessage() {
             },
             body: JSON.stringify({ content })
         });
-        loadChat(true); // Refresh immediate
+        // The message comes back over the socket; refetch only without one
+        if (!socket || !socket.connected) loadChat();
     } catch (err) {
         console.error(err);
         alert('Failed to send');
@@ -376,6 +482,7 @@ let currentOppCategory = 'certification'; // 'certification' or 'hackathon'
 let currentOppMode = 'all'; // 'all', 'online', 'offline'
 
 function clearUserCache() {
+    etagCache.clear();
     localStorage.removeItem('activeRoadmapData');
     localStorage.removeItem('completedMilestones');
     localStorage.removeItem('savedFullRoadmaps');
@@ -398,6 +505,7 @@ function checkLogin() {
         } else {
             const nameDisplay = document.getElementById('user-name-display');
             if (nameDisplay) nameDisplay.innerText = user || 'Guest';
+            getSocket();
             switchView('feed');
         }
     }
@@ -406,6 +514,8 @@ function checkLogin() {
 checkLogin();
 
 // Data Loading
+let feedNextCursor = null;
+
 async function loadFeed(updateDOM = true) {
     if (isFetching.feed) return;
     isFetching.feed = true;
@@ -418,11 +528,8 @@ async function loadFeed(updateDOM = true) {
     }
 
     try {
-        const res = await fetch(`${API_URL}/social/feed`, {
-            headers: { 'Authorization': `Bearer ${token}` }
-        });
-        if (!res.ok) throw new Error("Feed fetch failed");
-        const data = await res.json();
+        const data = await fetchJSON(`${API_URL}/social/feed`);
+        subscribeFeed(data.feed.map(post => post.id));
 
         let html = `
             <div class="glass-card" style="padding:15px; margin-bottom:20px;">
@@ -466,7 +573,15 @@ async function loadFeed(updateDOM = true) {
         });
 
         html += '</div>';
+        if (data.next_cursor) {
+            html += `<div id="feed-load-more" style="text-align:center; margin:20px 0;"><button class="btn-primary" onclick="loadMoreFeed()">Load more</button></div>`;
+        }
 
+        // A restored snapshot (updateDOM false) keeps its own pages and cursor
+        if (updateDOM) {
+            feedNextCursor = data.next_cursor;
+            viewCache.feedCursor = feedNextCursor;
+        }
         if (viewCache.feed === html) return;
 
         viewCache.feed = html;
@@ -497,24 +612,27 @@ function renderSocialPost(post) {
             ` : `<div class="post-content">${post.content}</div>`}
             
             <div class="post-actions-bar">
-                <button class="action-btn ${post.has_liked ? 'liked' : ''}" onclick="toggleLike('${post.id}')">
+                <button id="like-btn-${post.id}" class="action-btn ${post.has_liked ? 'liked' : ''}" data-count="${post.likes_count}" onclick="toggleLike('${post.id}')">
                     <i class="${post.has_liked ? 'fas' : 'far'} fa-heart"></i> ${post.likes_count}
                 </button>
-                <button class="action-btn" onclick="toggleComments('${post.id}')">
-                    <i class="far fa-comment"></i> ${post.comments.length}
+                <button id="comment-btn-${post.id}" class="action-btn" onclick="toggleComments('${post.id}')">
+                    <i class="far fa-comment"></i> ${post.comments_count}
                 </button>
-                <button class="action-btn" onclick="repost('${post.id}')">
+                <button id="repost-btn-${post.id}" class="action-btn" onclick="repost('${post.id}')">
                     <i class="fas fa-retweet"></i> ${post.reposts_count}
                 </button>
             </div>
 
             <!-- Comments Section (Hidden by default) -->
             <div id="comments-${post.id}" style="display:none; margin-top:15px; border-top:1px solid rgba(255,255,255,0.1); padding-top:10px;">
-                ${post.comments.map(c => `
-                    <div style="margin-bottom:8px; font-size:0.9rem;">
-                        <span style="color:var(--primary-color); font-weight:bold;">${c.author_name}</span>: ${c.text}
+                ${post.comments_count > post.comments.length ? `
+                    <div id="comments-more-${post.id}" style="margin-bottom:8px; font-size:0.85rem;">
+                        <a href="#" style="color:var(--text-muted);" onclick="loadEarlierComments('${post.id}'); return false;">View all ${post.comments_count} comments</a>
                     </div>
-                `).join('')}
+                ` : ''}
+                <div id="comments-list-${post.id}">
+                    ${post.comments.map(renderComment).join('')}
+                </div>
                 <div style="display:flex; margin-top:10px; gap:10px;">
                     <input type="text" id="comment-input-${post.id}" placeholder="Write a comment..." style="flex:1; padding:8px; border-radius:4px; border:1px solid #ffffff20; background:rgba(0,0,0,0.3); color:white;">
                     <button class="btn-primary" style="padding:5px 15px; font-size:0.8rem;" onclick="addComment('${post.id}')">Reply</button>
@@ -524,6 +642,48 @@ function renderSocialPost(post) {
     `;
 }
 
+function prependFeedPost(post) {
+    const container = document.querySelector('.feed-container');
+    if (!container || document.getElementById(`post-${post.id}`)) return;
+    container.insertAdjacentHTML('afterbegin', renderSocialPost(post));
+    subscribeFeed([post.id]);
+}
+
+function appendLiveComment({ post_id, comments_count, comment }) {
+    const list = document.getElementById(`comments-list-${post_id}`);
+    if (!list || document.getElementById(`comment-${comment.id}`)) return;
+    list.insertAdjacentHTML('beforeend', renderComment(comment));
+    patchPostCounts({ post_id, comments_count });
+}
+
+// Patch one card in place from a count delta instead of reloading the feed
+function patchPostCounts({ post_id, likes_count, comments_count, reposts_count }) {
+    const likeBtn = document.getElementById(`like-btn-${post_id}`);
+    if (likeBtn && likes_count !== undefined) {
+        likeBtn.dataset.count = likes_count;
+        patchLiked({ post_id, liked: likeBtn.classList.contains('liked') });
+    }
+    const commentBtn = document.getElementById(`comment-btn-${post_id}`);
+    if (commentBtn && comments_count !== undefined) commentBtn.innerHTML = `<i class="far fa-comment"></i> ${comments_count}`;
+    const repostBtn = document.getElementById(`repost-btn-${post_id}`);
+    if (repostBtn && reposts_count !== undefined && reposts_count !== null) repostBtn.innerHTML = `<i class="fas fa-retweet"></i> ${reposts_count}`;
+}
+
+function patchLiked({ post_id, liked }) {
+    const likeBtn = document.getElementById(`like-btn-${post_id}`);
+    if (!likeBtn) return;
+    likeBtn.classList.toggle('liked', liked);
+    likeBtn.innerHTML = `<i class="${liked ? 'fas' : 'far'} fa-heart"></i> ${likeBtn.dataset.count}`;
+}
+
+function renderComment(c) {
+    return `
+        <div id="comment-${c.id}" style="margin-bottom:8px; font-size:0.9rem;">
+            <span style="color:var(--primary-color); font-weight:bold;">${c.author_name}</span>: ${c.text}
+        </div>
+    `;
+}
+
 function renderOpportunities(opportunities) {
     let html = `
         <div class="opp-tabs">
@@ -573,13 +733,7 @@ async function loadOpportunities(updateDOM = true) {
     }
 
     try {
-        const res = await fetch(`${API_URL}/opportunities/?category=${currentOppCategory}&mode=${currentOppMode}`, {
-            headers: { 'Authorization': `Bearer ${token}` }
-        });
-
-        if (!res.ok) throw new Error("Failed to load opportunities");
-
-        const data = await res.json();
+        const data = await fetchJSON(`${API_URL}/opportunities/?category=${currentOppCategory}&mode=${currentOppMode}`);
         const html = renderOpportunities(data.opportunities);
         viewCache.opportunities = html;
 
@@ -596,6 +750,31 @@ async function loadOpportunities(updateDOM = true) {
     }
 }
 
+async function loadMoreFeed() {
+    if (!feedNextCursor || isFetching.feed) return;
+    isFetching.feed = true;
+
+    try {
+        const res = await fetch(`${API_URL}/social/feed?before=${encodeURIComponent(feedNextCursor)}`, {
+            headers: { 'Authorization': `Bearer ${token}` }
+        });
+        if (!res.ok) throw new Error("Feed fetch failed");
+        const data = await res.json();
+
+        // Skip cards already on the page (a live push or an earlier page)
+        const posts = data.feed.filter(post => !document.getElementById(`post-${post.id}`));
+        const container = document.querySelector('.feed-container');
+        if (container) container.insertAdjacentHTML('beforeend', posts.map(renderSocialPost).join(''));
+        subscribeFeed(posts.map(post => post.id));
+
+        feedNextCursor = data.next_cursor;
+        const moreBtn = document.getElementById('feed-load-more');
+        if (moreBtn && !feedNextCursor) moreBtn.remove();
+    } catch (err) { console.error(err); } finally {
+        isFetching.feed = false;
+    }
+}
+
 async function toggleLike(postId) {
     try {
         const res = await fetch(`${API_URL}/social/posts/${postId}/like`, {
@@ -603,7 +782,9 @@ async function toggleLike(postId) {
             headers: { 'Authorization': `Bearer ${token}` }
         });
         if (res.ok) {
-            loadFeed(true); // Reload to update UI state
+            const data = await res.json();
+            patchPostCounts({ post_id: postId, likes_count: data.likes_count });
+            patchLiked({ post_id: postId, liked: data.liked });
         }
     } catch (err) { console.error(err); }
 }
@@ -616,7 +797,9 @@ async function repost(postId) {
             headers: { 'Authorization': `Bearer ${token}` }
         });
         if (res.ok) {
-            loadFeed(true);
+            const data = await res.json();
+            prependFeedPost(data.post);
+            patchPostCounts({ post_id: data.original_post_id, reposts_count: data.reposts_count });
         }
     } catch (err) { console.error(err); }
 }
@@ -626,13 +809,40 @@ function toggleComments(postId) {
     el.style.display = el.style.display === 'none' ? 'block' : 'none';
 }
 
+const commentCursors = {};
+
+async function loadEarlierComments(postId) {
+    const list = document.getElementById(`comments-list-${postId}`);
+    const firstPage = !(postId in commentCursors);
+    let url = `${API_URL}/social/posts/${postId}/comments`;
+    if (!firstPage) url += `?before=${encodeURIComponent(commentCursors[postId])}`;
+
+    try {
+        const res = await fetch(url, { headers: { 'Authorization': `Bearer ${token}` } });
+        if (!res.ok) throw new Error("Comments fetch failed");
+        const data = await res.json();
+
+        // Pages arrive newest first; the list renders oldest first
+        const html = data.comments.slice().reverse().map(renderComment).join('');
+        if (firstPage) list.innerHTML = html;
+        else list.insertAdjacentHTML('afterbegin', html);
+
+        commentCursors[postId] = data.next_cursor;
+        const more = document.getElementById(`comments-more-${postId}`);
+        if (more) {
+            if (data.next_cursor) more.innerHTML = `<a href="#" style="color:var(--text-muted);" onclick="loadEarlierComments('${postId}'); return false;">View earlier comments</a>`;
+            else more.remove();
+        }
+    } catch (err) { console.error(err); }
+}
+
 async function addComment(postId) {
     const input = document.getElementById(`comment-input-${postId}`);
     const text = input.value.trim();
     if (!text) return;
 
     try {
-        await fetch(`${API_URL}/social/posts/${postId}/comment`, {
+        const res = await fetch(`${API_URL}/social/posts/${postId}/comment`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -641,23 +851,29 @@ async function addComment(postId) {
             body: JSON.stringify({ text })
         });
         input.value = '';
-        loadFeed(true);
+        if (res.ok) appendLiveComment(await res.json());
     } catch (err) { console.error(err); }
 }
 
 async function createPost() {
-    const content = document.getElementById('new-post-content').value;
+    const input = document.getElementById('new-post-content');
+    const content = input.value;
     if (!content) return;
 
-    await fetch(`${API_URL}/social/posts`, {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-            'Authorization': `Bearer ${token}`
-        },
-        body: JSON.stringify({ content })
-    });
-    loadFeed();
+    try {
+        const res = await fetch(`${API_URL}/social/posts`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${token}`
+            },
+            body: JSON.stringify({ content })
+        });
+        if (res.ok) {
+            input.value = '';
+            prependFeedPost((await res.json()).post);
+        }
+    } catch (err) { console.error(err); }
 }
 
 // Redundant code removed
@@ -784,11 +1000,10 @@ async function loadRoadmap(updateDOM = true, customInterest = null) {
 
         if (needsListSync || needsProgressSync) {
             const fetches = [];
-            if (needsListSync) fetches.push(fetch(`${API_URL}/roadmap/list`, { headers: { 'Authorization': `Bearer ${token}` } }));
-            if (needsProgressSync) fetches.push(fetch(`${API_URL}/roadmap/progress`, { headers: { 'Authorization': `Bearer ${token}` } }));
+            if (needsListSync) fetches.push(fetchJSON(`${API_URL}/roadmap/list`));
+            if (needsProgressSync) fetches.push(fetchJSON(`${API_URL}/roadmap/progress`));
 
-            const responses = await Promise.all(fetches);
-            const data = await Promise.all(responses.map(r => r.json()));
+            const data = await Promise.all(fetches);
 
             let idx = 0;
             if (needsListSync) {
@@ -1586,6 +1801,8 @@ async function sendChatMessage() {
     appendMessage('user', message);
     input.value = '';
 
+    if (await streamChatMessage(message)) return;
+
     try {
         const res = await fetch(`${API_URL}/roadmap/chat`, {
             method: 'POST',
@@ -1603,6 +1820,54 @@ async function sendChatMessage() {
     }
 }
 
+// Render the answer token by token from the SSE endpoint; false means use the plain one
+async function streamChatMessage(message) {
+    let res;
+    try {
+        res = await fetch(`${API_URL}/roadmap/chat/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Authorization': `Bearer ${localStorage.getItem('token')}`
+            },
+            body: JSON.stringify({ message })
+        });
+    } catch (err) { return false; }
+    if (!res.ok || !res.body) return false;
+
+    const div = appendMessage('bot', '');
+    const container = document.getElementById('chat-messages');
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    // Reading innerText back collapses whitespace, so the answer is kept here
+    let answer = '';
+
+    try {
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            const frames = buffer.split('\n\n');
+            buffer = frames.pop();
+            for (const frame of frames) {
+                const event = (frame.match(/^event: (.*)$/m) || [])[1] || 'message';
+                const data = (frame.match(/^data: (.*)$/m) || [])[1];
+                if (!data || event === 'done') continue;
+
+                answer += JSON.parse(data).token;
+                div.innerText = answer;
+                container.scrollTop = container.scrollHeight;
+            }
+        }
+    } catch (err) {
+        console.error(err);
+        if (!answer) div.innerText = "Sorry, I'm having trouble connecting right now.";
+    }
+    return true;
+}
+
 function appendMessage(type, text) {
     const container = document.getElementById('chat-messages');
     const div = document.createElement('div');
@@ -1610,6 +1875,7 @@ function appendMessage(type, text) {
     div.innerText = text;
     container.appendChild(div);
     container.scrollTop = container.scrollHeight;
+    return div;
 }
 
 function getChatbotHTML() {
@@ -1,9 +1,27 @@
 from functools import wraps
 from flask import request, jsonify, current_app
 import jwt
-from app import mongo
+from app import mongo, user_cache
+from app.loader import get_loader, forget
+from app.invalidation import invalidation_bus
 from bson import ObjectId
 
+def load_user(user_id):
+    loader = get_loader()
+    current_user = user_cache.get(user_id)
+    if current_user is None:
+        current_user = loader.load('users', ObjectId(user_id))
+        if current_user:
+            user_cache.set(user_id, current_user)
+    else:
+        loader.prime('users', current_user)
+    return current_user
+
+def load_token_user(token):
+    # Raises jwt.InvalidTokenError subclasses for bad or expired tokens
+    data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
+    return load_user(data['user_id'])
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -19,8 +37,7 @@ def token_required(f):
             return jsonify({'message': 'Token is missing!'}), 401
 
         try:
-            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=["HS256"])
-            current_user = mongo.db.users.find_one({'_id': ObjectId(data['user_id'])})
+            current_user = load_token_user(token)
             if not current_user:
                  return jsonify({'message': 'User not found!'}), 401
         except jwt.ExpiredSignatureError:
@@ -33,3 +50,12 @@ def token_required(f):
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+def update_user(user_id, update):
+    # `rev` versions the document for ETags
+    update = dict(update, **{'$inc': dict(update.get('$inc', {}), rev=1)})
+    result = mongo.db.users.update_one({'_id': user_id}, update)
+    user_cache.invalidate(str(user_id))
+    forget('users', user_id)
+    invalidation_bus.publish('user', str(user_id))
+    return result
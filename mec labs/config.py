@@ -10,3 +10,30 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-prod'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
     OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', 10000))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    BCRYPT_POOL_SIZE = int(os.environ.get('BCRYPT_POOL_SIZE', 4))
+    BCRYPT_MAX_PENDING = int(os.environ.get('BCRYPT_MAX_PENDING', 32))
+    ENSURE_INDEXES_ON_STARTUP = os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true'
+    INDEX_BOOTSTRAP_TIMEOUT_MS = int(os.environ.get('INDEX_BOOTSTRAP_TIMEOUT_MS', 2000))
+    FEED_RING_SIZE = int(os.environ.get('FEED_RING_SIZE', 200))
+    FEED_RING_TTL = int(os.environ.get('FEED_RING_TTL', 30))
+    FANOUT_FOLLOWER_LIMIT = int(os.environ.get('FANOUT_FOLLOWER_LIMIT', 1000))
+    TIMELINE_BACKFILL_SIZE = int(os.environ.get('TIMELINE_BACKFILL_SIZE', 20))
+    CHAT_WRITE_BEHIND = os.environ.get('CHAT_WRITE_BEHIND', 'false').lower() == 'true'
+    CHAT_FLUSH_INTERVAL_MS = int(os.environ.get('CHAT_FLUSH_INTERVAL_MS', 20))
+    CHAT_BATCH_SIZE = int(os.environ.get('CHAT_BATCH_SIZE', 100))
+    CHAT_MAX_UNFLUSHED = int(os.environ.get('CHAT_MAX_UNFLUSHED', 500))
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+    SOCKETIO_BATCH_WINDOW_MS = int(os.environ.get('SOCKETIO_BATCH_WINDOW_MS', 50))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_QUALITY = int(os.environ.get('COMPRESS_BR_QUALITY', 4))
+    LLM_POOL_SIZE = int(os.environ.get('LLM_POOL_SIZE', 10))
+    LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 2))
+    LLM_RETRY_BACKOFF = float(os.environ.get('LLM_RETRY_BACKOFF', 0.5))
+    LLM_CACHE_LOCAL_SIZE = int(os.environ.get('LLM_CACHE_LOCAL_SIZE', 500))
+    LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))
+    LLM_BREAKER_THRESHOLD = int(os.environ.get('LLM_BREAKER_THRESHOLD', 5))
+    LLM_BREAKER_RESET = int(os.environ.get('LLM_BREAKER_RESET', 30))
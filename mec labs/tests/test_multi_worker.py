@@ -0,0 +1,94 @@
+# The app monkey-patches gevent on import; fakeredis must see the patched locks
+from app import create_app
+import time
+import types
+import pytest
+import redis
+import socketio
+from flask import json as flask_json
+from config import Config
+
+fakeredis = pytest.importorskip('fakeredis')
+
+QUEUE = 'redis://localhost:6379/0'
+
+
+class MultiWorkerConfig(Config):
+    TESTING = True
+    ENSURE_INDEXES_ON_STARTUP = False
+    SOCKETIO_MESSAGE_QUEUE = QUEUE
+    SOCKETIO_BATCH_WINDOW_MS = 0
+
+
+@pytest.fixture(scope='module')
+def redis_server():
+    # Every Redis client (Socket.IO's queue and the invalidation bus) shares one fake server
+    server = fakeredis.FakeServer()
+    patch = pytest.MonkeyPatch()
+    patch.setattr(redis.Redis, 'from_url', classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server)))
+    yield server
+    patch.undo()
+
+
+@pytest.fixture(scope='module')
+def worker_a(redis_server):
+    return create_app(MultiWorkerConfig)
+
+
+@pytest.fixture(scope='module')
+def worker_b(redis_server):
+    # Another process's Socket.IO server on the same queue, with one client in
+    # the feed room; whatever it would send that client is captured instead
+    server = socketio.Server(
+        client_manager=socketio.RedisManager(QUEUE, channel='flask-socketio'),
+        async_mode='gevent',
+        json=flask_json
+    )
+    server.sent = []
+    server.eio.send_packet = lambda eio_sid, pkt: server.sent.append(server.packet_class(encoded_packet=pkt.data).data)
+    server.manager_initialized = True
+    server.manager.initialize()
+    sid = server.manager.connect('client-on-b', '/')
+    server.manager.enter_room(sid, '/', 'feed')
+    assert _wait_for(lambda: server.manager.pubsub is not None and server.manager.pubsub.subscribed)
+    return server
+
+
+def _wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_feed_event_from_worker_a_reaches_client_on_worker_b(worker_a, worker_b):
+    from app.social.emitter import emitter
+    from app.social.routes import FEED_SOCKET_ROOM
+
+    with worker_a.app_context():
+        emitter.emit('new_post', {'post': {'id': 'p1', 'content': 'hello'}}, to=FEED_SOCKET_ROOM)
+
+    assert _wait_for(lambda: worker_b.sent)
+    assert worker_b.sent == [['new_post', {'post': {'id': 'p1', 'content': 'hello'}}]]
+
+
+def test_invalidation_reaches_other_workers_only(worker_a):
+    # worker_a is only needed for the Socket.IO server that runs the listeners
+    from app.invalidation import InvalidationBus
+
+    config = types.SimpleNamespace(config={'SOCKETIO_MESSAGE_QUEUE': QUEUE})
+    bus_a, bus_b = InvalidationBus(), InvalidationBus()
+    seen = {'a': [], 'b': []}
+    bus_a.register('user', seen['a'].append)
+    bus_b.register('user', seen['b'].append)
+    bus_a.init_app(config)
+    bus_b.init_app(config)
+    time.sleep(0.1)
+
+    bus_a.publish('user', 'u1')
+
+    assert _wait_for(lambda: seen['b'] == ['u1'])
+    assert seen['a'] == []
+    assert (bus_a.published, bus_b.received) == (1, 1)
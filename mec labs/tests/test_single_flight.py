@@ -0,0 +1,53 @@
+import gevent
+import pytest
+from unittest import mock
+from app.roadmap.single_flight import SingleFlight
+
+
+def _slow(result):
+    def fetch():
+        gevent.sleep(0.01)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return mock.Mock(side_effect=fetch)
+
+
+def test_concurrent_identical_calls_make_one_upstream_call():
+    flights = SingleFlight()
+    fetch = _slow({'roadmap': 'python'})
+
+    calls = [gevent.spawn(flights.do, 'roadmap:python|beginner', fetch) for _ in range(25)]
+    gevent.joinall(calls, raise_error=True)
+
+    assert fetch.call_count == 1
+    assert all(call.value == {'roadmap': 'python'} for call in calls)
+    assert flights.stats() == {'in_flight': 0, 'leaders': 1, 'followers': 24}
+
+
+def test_followers_get_the_leaders_exception():
+    flights = SingleFlight()
+    fetch = _slow(TimeoutError('upstream timed out'))
+
+    calls = [gevent.spawn(flights.do, 'quiz:arrays', fetch) for _ in range(10)]
+    gevent.joinall(calls)
+
+    assert fetch.call_count == 1
+    for call in calls:
+        assert isinstance(call.exception, TimeoutError)
+
+
+def test_keys_are_released_and_independent():
+    flights = SingleFlight()
+    fetch = _slow('ok')
+
+    gevent.joinall([gevent.spawn(flights.do, key, fetch) for key in ('a', 'b', 'a', 'b')], raise_error=True)
+    assert fetch.call_count == 2
+
+    # Once a call finishes, the next one for the same key goes upstream again
+    assert flights.do('a', fetch) == 'ok'
+    assert fetch.call_count == 3
+
+    with pytest.raises(TimeoutError):
+        flights.do('a', _slow(TimeoutError()))
+    assert flights.do('a', fetch) == 'ok'